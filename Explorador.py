@@ -57,6 +57,7 @@ Aquí podrás encontrar:
 - **Visión General de Calificaciones:** Un vistazo a cómo se distribuyen las valoraciones.
 - **Episodios de series:** Un vistazo a la cantidad de episodios y temporadas de las series junto a su calificación.
 - **Tendencias Temporales:** Cómo han cambiado las cosas a lo largo de los años.
+- **Recomendaciones:** Títulos parecidos a uno que te haya gustado, para elegir qué ver en tu próxima noche de películas.
 """)
 
 # --- Imagen lateral ---
@@ -1,7 +1,11 @@
 # pages/01_Calificaciones.py
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+
+from utils import figure_cache, genre_stats, lean_render, out_of_core, rating_density, timing, weighted_rating
 
 # --- Configuración de la página ---
 st.set_page_config(
@@ -19,11 +23,13 @@ load_css("style.css")
 st.sidebar.image("images/IMDB_Logo_2016.png", width=280)
 st.sidebar.markdown("¡Explora más en la [Página Oficial de IMDb](https://www.imdb.com/)!")
 
+DATA_FILE = 'data/imdb_dataset.csv'
+
 # --- Función para cargar los datos (con caché para eficiencia) ---
 @st.cache_data
 def load_data():
     try:
-        df = pd.read_csv('data/imdb_dataset.csv', encoding='utf-8')
+        df = pd.read_csv(DATA_FILE, encoding='utf-8')
         
         # Convertir tipos de datos y manejar errores
         df['startYear'] = pd.to_numeric(df['startYear'], errors='coerce')
@@ -47,8 +53,66 @@ def load_data():
         st.info("Verifica el formato del archivo y los nombres de las columnas.")
         return pd.DataFrame()
 
+# --- Modo out-of-core: agregados calculados por bloques, sin cargar el dataset completo ---
+OUT_OF_CORE = out_of_core.OUT_OF_CORE_ENABLED
+
+# Sin caché propia: los agregados se comparten con las demás páginas desde out_of_core
+def load_aggregates():
+    try:
+        return out_of_core.load_catalog_aggregates(DATA_FILE)
+    except FileNotFoundError:
+        st.error(f"Error: El archivo '{DATA_FILE}' no se encontró.")
+        return None
+    except Exception as e:
+        st.error(f"Ocurrió un error al agregar los datos por bloques: {e}")
+        return None
+
 # Cargar los datos
-df_combined = load_data()
+if OUT_OF_CORE:
+    aggregates = load_aggregates()
+    df_combined = pd.DataFrame()
+    data_loaded = aggregates is not None
+else:
+    aggregates = None
+    df_combined = load_data()
+    data_loaded = not df_combined.empty
+
+# --- Co-ocurrencia de géneros (se construye una sola vez por proceso) ---
+@st.cache_data
+def load_genre_pairs():
+    if OUT_OF_CORE:
+        return aggregates.genre_pairs
+    return genre_stats.genre_cooccurrence(
+        df_combined,
+        out_of_core.rating_range_index(df_combined['averageRating'].to_numpy())
+    )
+
+# --- Índice de densidad calificación x votos (solo lectura, compartido entre sesiones) ---
+@st.cache_resource
+def load_density_index():
+    return rating_density.build_density_index(df_combined)
+
+# --- Rankings por calificación ponderada, ya ordenados, para cada par (C, m) usado ---
+@st.cache_data
+def catalog_mean_rating():
+    if OUT_OF_CORE:
+        return aggregates.year_type['sum'].sum() / aggregates.year_type['count'].sum()
+    return df_combined['averageRating'].mean()
+
+@st.cache_resource
+def load_ranking_groups():
+    return weighted_rating.build_ranking_groups(aggregates.top_candidates if OUT_OF_CORE else df_combined)
+
+@st.cache_resource(max_entries=16)
+def load_weighted_rankings(prior_mean, min_votes):
+    return weighted_rating.build_rankings(load_ranking_groups(), prior_mean, min_votes)
+
+# Versión del dataset para invalidar las figuras guardadas en la caché de disco
+DATA_VERSION = (
+    figure_cache.dataset_version(DATA_FILE)
+    + ("-ooc" if OUT_OF_CORE else "")
+    + ("-lean" if lean_render.LEAN_RENDER else "")
+)
 
 # --- Mapeo de nombres originales a nombres amigables para la interfaz ---
 NAME_MAP = {
@@ -67,19 +131,31 @@ COLOR_MAP_TOP = {
     "Series": "#E34A33"
 }
 
+# --- Modos de ordenamiento del Top 30 ---
+RANKING_RAW = "Calificación (con mínimo de votos)"
+RANKING_WEIGHTED = "Calificación ponderada (bayesiana)"
+
+# --- Rangos de calificación (gráfico de torta y co-ocurrencia de géneros) ---
+# Los mismos con los que out_of_core.rating_range_index arma las tablas pre-agregadas
+RATING_RANGES = out_of_core.RATING_RANGES
+
 # --- Contenido de la Página Principal ---
 st.title("Calificaciones y Títulos Destacados en IMDb")
-st.markdown("Explora la distribución general de calificaciones, la composición de géneros por rango de calificación y descubre los títulos mejor puntuados.")
+st.markdown("Explora la distribución general de calificaciones, la composición de géneros por rango de calificación, qué géneros aparecen juntos, descubre los títulos mejor puntuados y compara calificaciones con cantidad de votos.")
 
 
 
-if not df_combined.empty:
-    # --- SECCIÓN 1: HISTOGRAMA DE CALIFICACIONES ---
+# --- SECCIÓN 1: HISTOGRAMA DE CALIFICACIONES ---
+@timing.section("calificaciones", "histograma")
+def render_histogram_section():
     st.header("Distribución de Calificaciones")
     st.markdown("Observa cómo se distribuyen las calificaciones promedio de los títulos.")
 
     # Widget Selectbox para filtrar el HISTOGRAMA
-    hist_title_types_original = df_combined['titleType'].dropna().unique().tolist()
+    if OUT_OF_CORE:
+        hist_title_types_original = aggregates.title_types
+    else:
+        hist_title_types_original = df_combined['titleType'].dropna().unique().tolist()
     hist_display_title_types = ["Todos"] + [NAME_MAP.get(tt, tt) for tt in hist_title_types_original if tt in NAME_MAP]
     hist_display_title_types.sort(key=lambda x: (
         0 if x == "Todos" else 1 if x == "Películas" else 2 if x == "Series" else 3
@@ -99,40 +175,72 @@ if not df_combined.empty:
         inverted_name_map = {v: k for k, v in NAME_MAP.items()}
         selected_hist_internal_type = inverted_name_map.get(selected_hist_display_type, selected_hist_display_type)
 
-    df_hist_filtered = df_combined.copy()
-    if selected_hist_internal_type != "Todos":
-        df_hist_filtered = df_hist_filtered[df_hist_filtered['titleType'] == selected_hist_internal_type]
-
-    if not df_hist_filtered.empty:
+    def build_hist_figure():
         current_hist_color = COLOR_MAP_HIST.get(selected_hist_display_type, "#6A5ACD")
 
+        if OUT_OF_CORE or lean_render.LEAN_RENDER:
+            # Enviar solo los conteos por intervalo en lugar de todas las filas
+            if OUT_OF_CORE:
+                # Los intervalos ya vienen contados desde la pasada por bloques
+                df_hist_bins = out_of_core.rating_histogram(aggregates, selected_hist_internal_type)
+            else:
+                df_hist_filtered = df_combined
+                if selected_hist_internal_type != "Todos":
+                    df_hist_filtered = df_combined[df_combined['titleType'] == selected_hist_internal_type]
+                df_hist_bins = out_of_core.rating_histogram_from_values(df_hist_filtered['averageRating'])
+            if df_hist_bins['count'].sum() == 0:
+                return None
+            fig_hist = px.bar(
+                df_hist_bins,
+                x='averageRating',
+                y='count',
+                title=f'Histograma de Calificaciones Promedio de {selected_hist_display_type}',
+                labels={'averageRating': 'Calificación Promedio', 'count': 'Número de Títulos'},
+                color_discrete_sequence=[current_hist_color]
+            )
+            fig_hist.update_layout(xaxis_title="Calificación Promedio", yaxis_title="Número de Títulos", bargap=0.05)
+            return fig_hist
+
+        df_hist_filtered = df_combined
+        if selected_hist_internal_type != "Todos":
+            df_hist_filtered = df_combined[df_combined['titleType'] == selected_hist_internal_type]
+        if df_hist_filtered.empty:
+            return None
+
         fig_hist = px.histogram(
             df_hist_filtered,
             x='averageRating',
-            nbins=20,
             title=f'Histograma de Calificaciones Promedio de {selected_hist_display_type}',
             labels={'averageRating': 'Calificación Promedio', 'count': 'Número de Títulos'},
             color_discrete_sequence=[current_hist_color]
         )
+        # Mismos intervalos que el histograma pre-agregado de los otros modos
+        edges = out_of_core.RATING_BIN_EDGES
+        fig_hist.update_traces(xbins=dict(start=edges[0], end=edges[-1], size=out_of_core.RATING_BIN_SIZE))
         fig_hist.update_layout(xaxis_title="Calificación Promedio", yaxis_title="Número de Títulos", bargap=0.05)
-        st.plotly_chart(fig_hist, use_container_width=True)
+        return fig_hist
+
+    fig_hist = figure_cache.cached_figure(
+        "calificaciones", "histograma",
+        {"tipo": selected_hist_internal_type},
+        DATA_VERSION, build_hist_figure
+    )
+    if fig_hist is not None:
+        lean_render.show_chart(fig_hist, "calificaciones", "histograma")
     else:
         st.warning(f"No hay datos para generar el histograma para '{selected_hist_display_type}'.")
 
 
-    st.markdown("---") # Un separador visual
-    # --- SECCIÓN 2: GRÁFICO DE TORTA DE GÉNEROS POR RANGO DE CALIFICACIÓN ---
+# --- SECCIÓN 2: GRÁFICO DE TORTA DE GÉNEROS POR RANGO DE CALIFICACIÓN ---
+@timing.section("calificaciones", "torta_generos")
+def render_genre_pie_section():
     st.header("Composición de Géneros por Rango de Calificación")
     st.markdown("Selecciona un rango de calificación y **entre 3 y 5 géneros** para ver su proporción dentro de ese segmento de títulos. Esto ayuda a entender qué géneros son populares en diferentes rangos de puntuación.")
 
     # --- Selectbox para Rangos de Puntuación ---
-    rating_ranges = [
-        "1.0 - 2.0", "2.1 - 3.0", "3.1 - 4.0", "4.1 - 5.0",
-        "5.1 - 6.0", "6.1 - 7.0", "7.1 - 8.0", "8.1 - 9.0", "9.1 - 10.0"
-    ]
     selected_rating_range = st.selectbox(
         "Selecciona un rango de calificación:",
-        options=rating_ranges,
+        options=RATING_RANGES,
         index=6, # Por defecto, selecciona "7.1 - 8.0"
         key='pie_rating_range_selectbox'
     )
@@ -140,16 +248,22 @@ if not df_combined.empty:
     # Parsear el rango seleccionado
     min_rating, max_rating = map(float, selected_rating_range.split(' - '))
 
-    # Filtrar el DataFrame por el rango de calificación
-    df_filtered_by_rating_range = df_combined[
-        (df_combined['averageRating'] >= min_rating) &
-        (df_combined['averageRating'] <= max_rating) &
-        (df_combined['genres'].notna()) # Asegurarse de que tienen géneros
-    ].copy()
-
-    # Obtener todos los géneros únicos para el multiselect (basado en el DataFrame filtrado por rango)
-    all_genres_in_range = df_filtered_by_rating_range['genres'].dropna().str.split(',').explode().unique()
-    all_genres_in_range_sorted = sorted(all_genres_in_range)
+    if OUT_OF_CORE:
+        selected_range_index = RATING_RANGES.index(selected_rating_range)
+        all_genres_in_range_sorted = out_of_core.genres_in_rating_range(aggregates, selected_range_index)
+        has_titles_in_range = len(all_genres_in_range_sorted) > 0
+    else:
+        # Filtrar el DataFrame por el rango de calificación
+        df_filtered_by_rating_range = df_combined[
+            (df_combined['averageRating'] >= min_rating) &
+            (df_combined['averageRating'] <= max_rating) &
+            (df_combined['genres'].notna()) # Asegurarse de que tienen géneros
+        ].copy()
+        has_titles_in_range = not df_filtered_by_rating_range.empty
+
+        # Obtener todos los géneros únicos para el multiselect (basado en el DataFrame filtrado por rango)
+        all_genres_in_range = df_filtered_by_rating_range['genres'].dropna().str.split(',').explode().unique()
+        all_genres_in_range_sorted = sorted(all_genres_in_range)
 
     # --- Lógica de selección de géneros para el gráfico de torta (sin min_selections/max_selections) ---
     # Sugerir un default que se ajuste al límite, pero sin forzarlo directamente en el widget
@@ -166,13 +280,18 @@ if not df_combined.empty:
     )
 
     # --- Lógica condicional para mostrar el gráfico o advertencias (validación manual) ---
-    if not df_filtered_by_rating_range.empty:
+    if has_titles_in_range:
         if 3 <= len(selected_pie_genres) <= 5: # Validar el rango de selección aquí
-            # Contar la frecuencia de los géneros seleccionados dentro del rango de calificación
-            genre_counts_for_pie = df_filtered_by_rating_range['genres'].dropna().str.split(',').explode()
-            genre_counts_for_pie = genre_counts_for_pie[genre_counts_for_pie.isin(selected_pie_genres)].value_counts()
+            def build_pie_figure():
+                # Contar la frecuencia de los géneros seleccionados dentro del rango de calificación
+                if OUT_OF_CORE:
+                    genre_counts_for_pie = out_of_core.genre_counts_in_rating_range(aggregates, selected_range_index, selected_pie_genres)
+                else:
+                    genre_counts_for_pie = df_filtered_by_rating_range['genres'].dropna().str.split(',').explode()
+                    genre_counts_for_pie = genre_counts_for_pie[genre_counts_for_pie.isin(selected_pie_genres)].value_counts()
+                if genre_counts_for_pie.empty:
+                    return None
 
-            if not genre_counts_for_pie.empty:
                 df_pie_chart_data = genre_counts_for_pie.reset_index()
                 df_pie_chart_data.columns = ['Genre', 'Count']
 
@@ -185,7 +304,16 @@ if not df_combined.empty:
                     color_discrete_sequence=px.colors.sequential.Plotly3
                 )
                 fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_pie, use_container_width=True)
+                return fig_pie
+
+            fig_pie = figure_cache.cached_figure(
+                "calificaciones", "torta_generos",
+                {"rango": selected_rating_range, "generos": set(selected_pie_genres)},
+                DATA_VERSION, build_pie_figure
+            )
+
+            if fig_pie is not None:
+                lean_render.show_chart(fig_pie, "calificaciones", "torta_generos")
             else:
                 st.warning("No hay títulos con los géneros seleccionados en este rango de calificación. Intenta elegir otros géneros o un rango diferente.")
         elif len(selected_pie_genres) < 3:
@@ -196,8 +324,85 @@ if not df_combined.empty:
         st.warning(f"No hay títulos en el rango de calificación '{selected_rating_range}'. Intenta seleccionar un rango diferente.")
 
 
-    st.markdown("---") # Un separador visual
-    # --- SECCIÓN 3: TOP 30 TÍTULOS MEJOR PUNTUADOS ---
+# --- SECCIÓN 3: CO-OCURRENCIA DE GÉNEROS ---
+@timing.section("calificaciones", "coocurrencia_generos")
+def render_genre_cooccurrence_section():
+    st.header("Géneros que Aparecen Juntos")
+    st.markdown("Descubre qué combinaciones de géneros son más frecuentes y cómo se califican. Cada celda corresponde a los títulos que tienen ambos géneros a la vez.")
+
+    genre_pairs = load_genre_pairs()
+    pair_title_types = sorted(genre_pairs.index.get_level_values('titleType').unique())
+    default_pair_types = [tt for tt in NAME_MAP if tt in pair_title_types] or pair_title_types
+
+    col_types, col_ranges = st.columns(2)
+    with col_types:
+        selected_pair_types = st.multiselect(
+            "Tipos de título:",
+            options=pair_title_types,
+            default=default_pair_types,
+            format_func=lambda tt: NAME_MAP.get(tt, tt),
+            key='cooc_types_multiselect'
+        )
+    with col_ranges:
+        selected_pair_ranges = st.multiselect(
+            "Rangos de calificación:",
+            options=RATING_RANGES,
+            default=RATING_RANGES,
+            key='cooc_ranges_multiselect'
+        )
+
+    cooc_metric_label = st.radio(
+        "Mostrar:",
+        options=["Cantidad de títulos", "Calificación promedio"],
+        horizontal=True,
+        key='cooc_metric_radio'
+    )
+    hide_diagonal = st.checkbox(
+        "Ocultar la diagonal (total de títulos de cada género)",
+        value=True,
+        key='cooc_hide_diagonal'
+    )
+
+    MIN_TITLES_FOR_PAIR_AVERAGE = 10
+    if selected_pair_types and selected_pair_ranges:
+        cooc_metric = 'mean' if cooc_metric_label == "Calificación promedio" else 'count'
+        cooc_matrix = genre_stats.cooccurrence_matrix(
+            genre_pairs,
+            selected_pair_types,
+            [RATING_RANGES.index(r) for r in selected_pair_ranges],
+            metric=cooc_metric,
+            min_titles=MIN_TITLES_FOR_PAIR_AVERAGE if cooc_metric == 'mean' else 1
+        )
+
+        if not cooc_matrix.empty:
+            if hide_diagonal:
+                cooc_matrix = cooc_matrix.mask(pd.DataFrame(
+                    cooc_matrix.index.to_numpy()[:, None] == cooc_matrix.columns.to_numpy()[None, :],
+                    index=cooc_matrix.index,
+                    columns=cooc_matrix.columns
+                ))
+
+            fig_cooc = px.imshow(
+                cooc_matrix,
+                labels=dict(x="Género", y="Género", color=cooc_metric_label),
+                color_continuous_scale='YlOrRd' if cooc_metric == 'count' else 'Viridis',
+                aspect='auto',
+                title=f'{cooc_metric_label} por Par de Géneros'
+            )
+            fig_cooc.update_layout(height=750, xaxis_title="Género", yaxis_title="Género")
+            lean_render.show_chart(fig_cooc, "calificaciones", "coocurrencia_generos")
+
+            if cooc_metric == 'mean':
+                st.caption(f"Las celdas vacías tienen menos de {MIN_TITLES_FOR_PAIR_AVERAGE} títulos con ese par de géneros.")
+        else:
+            st.warning("No hay títulos para los tipos y rangos de calificación seleccionados.")
+    else:
+        st.info("Por favor, selecciona al menos un tipo de título y un rango de calificación.")
+
+
+# --- SECCIÓN 4: TOP 30 TÍTULOS MEJOR PUNTUADOS ---
+@timing.section("calificaciones", "top30")
+def render_top30_section():
     st.header("Top 30 Títulos Mejor Puntuados")
     st.markdown("Descubre las 30 películas o series con las calificaciones más altas, filtradas por un mínimo de votos para asegurar relevancia y evitar títulos con pocas valoraciones.")
 
@@ -214,52 +419,285 @@ if not df_combined.empty:
     inverted_name_map_top = {v: k for k, v in NAME_MAP.items()}
     selected_top_internal_type = inverted_name_map_top.get(selected_top_display_type, selected_top_display_type)
 
-    # Widget Slider para el Mínimo de Votos en el TOP 30
-    min_votes_threshold = st.slider(
-        f"Mínimo de votos para ser incluido en el Top 30 de {selected_top_display_type}:",
-        min_value=100,
-        max_value=250000,
-        value=5000,
-        step=100,
-        key=f'votes_slider_top_{selected_top_display_type}'
+    ranking_mode = st.radio(
+        "Ordenar por:",
+        options=[RANKING_RAW, RANKING_WEIGHTED],
+        horizontal=True,
+        key='top_ranking_mode'
     )
 
-    # Filtrar y ordenar el DataFrame para el TOP 30
-    df_for_top = df_combined[df_combined['titleType'] == selected_top_internal_type].copy()
-    df_filtered_by_votes_top = df_for_top[df_for_top['numVotes'] >= min_votes_threshold]
-
-    df_top_30 = df_filtered_by_votes_top.sort_values(
-        by=['averageRating', 'numVotes'],
-        ascending=[False, False]
-    ).head(30)
-
-    # --- Mostrar el Gráfico de Barras del Top 30 ---
-    if not df_top_30.empty:
+    if ranking_mode == RANKING_WEIGHTED:
+        st.caption("La calificación ponderada acerca la calificación de los títulos con pocos votos a la media a priori: WR = v/(v+m)·R + m/(v+m)·C, donde R es la calificación del título y v sus votos.")
+        col_prior, col_min_votes = st.columns(2)
+        with col_prior:
+            prior_mean = st.number_input(
+                "Calificación media a priori (C):",
+                min_value=1.0,
+                max_value=10.0,
+                value=round(float(catalog_mean_rating()), 1),
+                step=0.1,
+                format="%.1f",
+                key='top_prior_mean'
+            )
+        with col_min_votes:
+            prior_votes = st.number_input(
+                "Votos mínimos de peso (m):",
+                min_value=1,
+                value=weighted_rating.DEFAULT_MIN_VOTES,
+                step=1000,
+                key='top_prior_votes'
+            )
+
+        rankings = load_weighted_rankings(round(prior_mean, 1), int(prior_votes))
+        if OUT_OF_CORE:
+            # Solo hay candidatos por tipo de título: sin filtros de género ni década
+            selected_top_genre = selected_top_decade = weighted_rating.ALL
+        else:
+            ranked_keys = [key for key in rankings if key[0] == selected_top_internal_type]
+            col_genre, col_decade = st.columns(2)
+            with col_genre:
+                selected_top_genre = st.selectbox(
+                    "Género:",
+                    options=[weighted_rating.ALL] + sorted({g for _, g, _ in ranked_keys} - {weighted_rating.ALL}),
+                    key='top_genre_select'
+                )
+            with col_decade:
+                selected_top_decade = st.selectbox(
+                    "Década:",
+                    options=[weighted_rating.ALL] + sorted({d for _, _, d in ranked_keys} - {weighted_rating.ALL}),
+                    key='top_decade_select'
+                )
+        top_widget_state = {
+            "tipo": selected_top_internal_type, "modo": "ponderada", "C": round(prior_mean, 1),
+            "m": int(prior_votes), "genero": selected_top_genre, "decada": selected_top_decade
+        }
+        top_title_criteria = f"por Calificación Ponderada (C = {prior_mean:.1f}, m = {int(prior_votes):,})"
+        top_filters = [f for f in (selected_top_genre, selected_top_decade) if f != weighted_rating.ALL]
+        if top_filters:
+            top_title_criteria += f" - {', '.join(top_filters)}"
+    else:
+        # Widget Slider para el Mínimo de Votos en el TOP 30
+        min_votes_threshold = st.slider(
+            f"Mínimo de votos para ser incluido en el Top 30 de {selected_top_display_type}:",
+            min_value=100,
+            max_value=250000,
+            value=5000,
+            step=100,
+            key=f'votes_slider_top_{selected_top_display_type}'
+        )
+        top_widget_state = {"tipo": selected_top_internal_type, "min_votos": min_votes_threshold}
+        top_title_criteria = f"Mejor Puntuadas (Mín. {min_votes_threshold:,} votos)"
+
+    def build_top30_figure():
+        top_x = 'averageRating'
+        if ranking_mode == RANKING_WEIGHTED:
+            # Ranking ya ordenado: solo se buscan las filas del grupo seleccionado
+            df_top_30 = weighted_rating.top_n(
+                load_ranking_groups(), rankings,
+                selected_top_internal_type, selected_top_genre, selected_top_decade
+            )
+            top_x = 'weightedRating'
+        elif OUT_OF_CORE:
+            # Solo se ordenan los candidatos conservados durante la pasada por bloques
+            df_top_30 = out_of_core.top_n(aggregates, selected_top_internal_type, min_votes_threshold)
+        else:
+            # Filtrar y ordenar el DataFrame para el TOP 30
+            df_for_top = df_combined[df_combined['titleType'] == selected_top_internal_type]
+            df_filtered_by_votes_top = df_for_top[df_for_top['numVotes'] >= min_votes_threshold]
+
+            df_top_30 = df_filtered_by_votes_top.sort_values(
+                by=['averageRating', 'numVotes'],
+                ascending=[False, False]
+            ).head(30)
+        if df_top_30.empty:
+            return None
+
+        # --- Gráfico de Barras del Top 30 ---
         current_top_color = COLOR_MAP_TOP.get(selected_top_display_type, "#6A5ACD")
 
+        top_hover_data = {'startYear': True, 'genres': True, 'numVotes': ':,d'}
+        if top_x == 'weightedRating':
+            top_hover_data = {'averageRating': ':.1f', 'weightedRating': ':.2f', **top_hover_data}
+        if lean_render.LEAN_RENDER:
+            # Sin años ni géneros en el tooltip: solo las columnas que dibuja el gráfico
+            df_top_30 = lean_render.compact_frame(df_top_30, list(dict.fromkeys(['primaryTitle', 'averageRating', top_x, 'numVotes'])))
+            top_hover_data = {'numVotes': ':,d'}
+
+        top_x_label = 'Calificación Ponderada' if top_x == 'weightedRating' else 'Calificación Promedio'
         fig_top30 = px.bar(
-            df_top_30.sort_values(by='averageRating', ascending=True),
-            x='averageRating',
+            df_top_30.sort_values(by=top_x, ascending=True),
+            x=top_x,
             y='primaryTitle',
             orientation='h',
-            title=f'Top 30 {selected_top_display_type} Mejor Puntuadas (Mín. {min_votes_threshold:,} votos)',
+            title=f'Top 30 {selected_top_display_type} {top_title_criteria}',
             labels={
                 'primaryTitle': 'Título',
-                'averageRating': 'Calificación Promedio'
+                'averageRating': 'Calificación Promedio',
+                'weightedRating': 'Calificación Ponderada'
             },
             color_discrete_sequence=[current_top_color],
-            hover_data={'startYear': True, 'genres': True, 'numVotes': ':,d'}
+            hover_data=top_hover_data
         )
 
         fig_top30.update_layout(
             yaxis={'categoryorder':'total ascending'},
-            xaxis_title="Calificación Promedio",
+            xaxis_title=top_x_label,
             yaxis_title="Título",
             height=900
         )
+        return fig_top30
+
+    fig_top30 = figure_cache.cached_figure(
+        "calificaciones", "top30",
+        top_widget_state,
+        DATA_VERSION, build_top30_figure
+    )
 
-        st.plotly_chart(fig_top30, use_container_width=True)
+    # --- Mostrar el Gráfico de Barras del Top 30 ---
+    if fig_top30 is not None:
+        lean_render.show_chart(fig_top30, "calificaciones", "top30")
+    elif ranking_mode == RANKING_WEIGHTED:
+        st.warning(f"No se encontraron {selected_top_display_type.lower()} para el género y la década seleccionados. Intenta con otra combinación.")
     else:
         st.warning(f"No se encontraron {selected_top_display_type.lower()} en el Top 30 con los criterios seleccionados (mínimo {min_votes_threshold:,} votos). Intenta reducir el umbral de votos o selecciona un tipo de título diferente.")
+
+
+# --- SECCIÓN 5: DENSIDAD DE CALIFICACIÓN VS VOTOS ---
+@timing.section("calificaciones", "densidad_votos")
+def render_rating_density_section():
+    st.header("Calificación vs. Cantidad de Votos")
+    st.markdown("Cada celda agrupa los títulos con una calificación y una cantidad de votos similares (votos en escala logarítmica). Las celdas con muchos votos y baja calificación, o con alta calificación y pocos votos, ayudan a encontrar títulos sobrevalorados o infravalorados.")
+
+    if OUT_OF_CORE:
+        st.info("Esta sección necesita el catálogo cargado en memoria y no está disponible en modo out-of-core.")
+        return
+
+    density_index = load_density_index()
+    min_year = int(density_index.year.min())
+    max_year = int(density_index.year.max())
+
+    col_types, col_genres = st.columns(2)
+    with col_types:
+        selected_density_types = st.multiselect(
+            "Tipos de título:",
+            options=sorted(density_index.type_names),
+            default=[tt for tt in NAME_MAP if tt in density_index.type_names],
+            format_func=lambda tt: NAME_MAP.get(tt, tt),
+            key='density_types_multiselect'
+        )
+    with col_genres:
+        selected_density_genres = st.multiselect(
+            "Géneros (vacío = todos):",
+            options=sorted(density_index.genre_names),
+            key='density_genres_multiselect'
+        )
+    density_years = st.slider(
+        "Rango de años:",
+        min_value=min_year,
+        max_value=max_year,
+        value=(min_year, max_year),
+        key='density_years_slider'
+    )
+
+    if not selected_density_types:
+        st.info("Por favor, selecciona al menos un tipo de título.")
+        return
+
+    density_filters = (selected_density_types, density_years, selected_density_genres)
+    density_counts = rating_density.density_grid(density_index, *density_filters)
+    if density_counts.sum() == 0:
+        st.warning("No hay títulos con los filtros seleccionados. Intenta ampliar el rango de años o cambiar los géneros.")
+        return
+
+    def build_density_figure():
+        vote_centers = (rating_density.LOG_VOTE_EDGES[:-1] + rating_density.LOG_VOTE_EDGES[1:]) / 2
+        rating_centers = (rating_density.RATING_EDGES[:-1] + rating_density.RATING_EDGES[1:]) / 2
+        # Color en escala logarítmica: la densidad varía en varios órdenes de magnitud
+        log_counts = np.where(density_counts > 0, np.log10(np.maximum(density_counts, 1)), np.nan)
+        max_exponent = max(int(np.ceil(np.nanmax(log_counts))), 1)
+
+        fig_density = go.Figure(go.Heatmap(
+            x=vote_centers,
+            y=rating_centers,
+            z=log_counts,
+            customdata=density_counts,
+            colorscale='YlOrRd',
+            zmin=0,
+            colorbar=dict(
+                title="Títulos",
+                tickvals=list(range(max_exponent + 1)),
+                ticktext=[f"{10 ** k:,}" for k in range(max_exponent + 1)]
+            ),
+            hovertemplate="Votos: 10^%{x:.1f}<br>Calificación: %{y:.1f}<br>Títulos: %{customdata:,}<extra></extra>"
+        ))
+        vote_ticks = range(int(rating_density.LOG_VOTE_EDGES[-1]) + 1)
+        fig_density.update_layout(
+            title="Densidad de Títulos por Calificación y Cantidad de Votos",
+            xaxis=dict(title="Cantidad de Votos (escala logarítmica)", tickvals=list(vote_ticks), ticktext=[f"{10 ** k:,}" for k in vote_ticks]),
+            yaxis=dict(title="Calificación Promedio", range=[1, 10]),
+            height=600
+        )
+        return fig_density
+
+    fig_density = figure_cache.cached_figure(
+        "calificaciones", "densidad_votos",
+        {"tipos": selected_density_types, "años": density_years, "géneros": selected_density_genres},
+        DATA_VERSION, build_density_figure
+    )
+    lean_render.show_chart(fig_density, "calificaciones", "densidad_votos")
+
+    # --- Detalle de una celda: títulos con más votos, leídos desde el índice por celda ---
+    st.subheader("Títulos de una Celda")
+    rating_labels = rating_density.rating_bin_labels()
+    vote_labels = rating_density.vote_bin_labels()
+    densest_rating_bin, densest_vote_bin = np.unravel_index(density_counts.argmax(), density_counts.shape)
+
+    col_rating, col_votes = st.columns(2)
+    with col_rating:
+        selected_rating_label = st.selectbox(
+            "Calificación:",
+            options=rating_labels,
+            index=int(densest_rating_bin),
+            key='density_rating_bin_select'
+        )
+    with col_votes:
+        selected_vote_label = st.selectbox(
+            "Votos:",
+            options=vote_labels,
+            index=int(densest_vote_bin),
+            key='density_vote_bin_select'
+        )
+    selected_rating_bin = rating_labels.index(selected_rating_label)
+    selected_vote_bin = vote_labels.index(selected_vote_label)
+
+    cell_titles = rating_density.titles_in_cell(density_index, selected_rating_bin, selected_vote_bin, *density_filters)
+    if not cell_titles.empty:
+        st.caption(f"{density_counts[selected_rating_bin, selected_vote_bin]:,} títulos en la celda; se muestran los de más votos.")
+        st.dataframe(
+            cell_titles.assign(titleType=cell_titles['titleType'].map(lambda tt: NAME_MAP.get(tt, tt))).rename(columns={
+                'primaryTitle': 'Título', 'titleType': 'Tipo', 'startYear': 'Año',
+                'genres': 'Géneros', 'averageRating': 'Calificación', 'numVotes': 'Votos'
+            }).drop(columns=['tconst']),
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.info("No hay títulos en esa celda con los filtros seleccionados. Elige otra combinación de calificación y votos.")
+
+
+if data_loaded:
+    render_histogram_section()
+
+    st.markdown("---") # Un separador visual
+    render_genre_pie_section()
+
+    st.markdown("---") # Un separador visual
+    render_genre_cooccurrence_section()
+
+    st.markdown("---") # Un separador visual
+    render_top30_section()
+
+    st.markdown("---") # Un separador visual
+    render_rating_density_section()
 else:
     st.error("No se pudieron cargar los datos. Por favor, verifica la ruta del archivo CSV 'imdb_movies_and_series_combined.csv' y que no esté vacío.")
@@ -4,22 +4,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 import os
 
+from utils import figure_cache, lean_render, memory_guard, out_of_core, timing
+
 data_path = os.path.join(os.path.dirname(__file__), "..", "data")
-im1 = pd.read_csv(os.path.join(data_path, "imdb_episodios_parte1.csv"))
-im2 = pd.read_csv(os.path.join(data_path, "imdb_episodios_parte2.csv"))
-im3 = pd.read_csv(os.path.join(data_path, "imdb_episodios_parte3.csv"))
-im4 = pd.read_csv(os.path.join(data_path, "imdb_episodios_parte4.csv"))
-im5 = pd.read_csv(os.path.join(data_path, "imdb_episodios_parte5.csv"))
-# Unir todos los DataFrames en uno solo
-imdb_episodios = pd.concat([im1, im2, im3, im4, im5], ignore_index=True)
-
-ep1 = pd.read_csv(os.path.join(data_path, "title_parte1.tsv"))
-ep2 = pd.read_csv(os.path.join(data_path, "title_parte2.tsv"))
-ep3 = pd.read_csv(os.path.join(data_path, "title_parte3.tsv"))
-# Unir todos los DataFrames en uno solo
-title_episode = pd.concat([ep1, ep2, ep3], ignore_index=True)
+MAIN_DATA_FILE = 'data/imdb_dataset.csv'
+EPISODE_RATING_FILES = [os.path.join(data_path, f"imdb_episodios_parte{i}.csv") for i in range(1, 6)]
+EPISODE_TITLE_FILES = [os.path.join(data_path, f"title_parte{i}.tsv") for i in range(1, 4)]
 
 # --- Configuración de la página ---
 st.set_page_config(
@@ -44,14 +37,17 @@ st.sidebar.markdown("---")
 
 
 # --- Funciones de Carga de Datos ---
-@st.cache_data
+# Los datos completos se comparten entre sesiones (st.cache_resource) en lugar de copiarse
+# en cada una, así el presupuesto de memoria cubre una sola copia por proceso. La página
+# solo los lee: los filtros devuelven DataFrames nuevos.
+@st.cache_resource(show_spinner="Cargando los datos de series y episodios...")
 def load_main_data():
     try:
         # Cargar dataset principal
-        df_combined = pd.read_csv('data/imdb_dataset.csv', encoding='utf-8')
+        df_combined = pd.read_csv(MAIN_DATA_FILE, encoding='utf-8')
 
-        # Usar directamente el DataFrame 
-        df_episodes_raw = title_episode.copy()
+        # Unir las partes de la tabla de episodios en un solo DataFrame
+        df_episodes_raw = pd.concat([pd.read_csv(path) for path in EPISODE_TITLE_FILES], ignore_index=True)
         df_episodes_raw.replace('\\N', pd.NA, inplace=True)
 
         # Procesar columnas del dataset principal
@@ -95,29 +91,345 @@ def load_main_data():
         st.error(f"Error inesperado: {e}")
         return pd.DataFrame()
 
-@st.cache_data
+@st.cache_resource(show_spinner="Cargando las calificaciones de episodios...")
 def load_episode_ratings_data():
     try:
-        return imdb_episodios.copy()
+        # Unir todas las partes en un solo DataFrame
+        return pd.concat([pd.read_csv(path) for path in EPISODE_RATING_FILES], ignore_index=True)
     except Exception as e:
         st.error(f"Ocurrió un error al procesar los datos de calificaciones de episodios: {e}")
         return pd.DataFrame()
 
+@st.cache_data
+def load_rated_series_titles():
+    # Solo la columna de títulos, leída por bloques
+    try:
+        titles = set()
+        for path in EPISODE_RATING_FILES:
+            for chunk in out_of_core.iter_chunks(path, ['series_primaryTitle']):
+                titles.update(chunk['series_primaryTitle'].dropna().unique())
+        return pd.DataFrame({'series_primaryTitle': sorted(titles)})
+    except Exception as e:
+        st.error(f"Ocurrió un error al leer los títulos de las series con calificaciones: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(max_entries=20)
+def load_series_episode_ratings(series_title):
+    # Carga perezosa: solo los episodios de la serie seleccionada
+    parts = []
+    for path in EPISODE_RATING_FILES:
+        for chunk in pd.read_csv(path, chunksize=out_of_core.CHUNK_ROWS):
+            parts.append(chunk[chunk['series_primaryTitle'] == series_title])
+    return pd.concat(parts, ignore_index=True)
+
+@st.cache_data(max_entries=20)
+def filter_series_episode_ratings(series_title):
+    # Modo completo: la tabla de episodios se filtra una vez por serie; al cambiar de
+    # temporada solo se filtra este recorte
+    return imdb_episodios[imdb_episodios['series_primaryTitle'] == series_title]
+
+# Sin caché propia: los agregados de series y temporadas se comparten desde out_of_core
+def load_aggregates():
+    try:
+        return out_of_core.load_episode_aggregates(MAIN_DATA_FILE, tuple(EPISODE_TITLE_FILES))
+    except FileNotFoundError as e:
+        st.error(f"Error al cargar archivos CSV/TSV: {e}")
+        return None
+    except Exception as e:
+        st.error(f"Error inesperado al agregar los datos por bloques: {e}")
+        return None
+
+# --- Control de memoria: decidir una vez por proceso si la carga completa cabe en el presupuesto ---
+@st.cache_resource
+def get_load_plan():
+    return memory_guard.plan_load([MAIN_DATA_FILE, *EPISODE_RATING_FILES, *EPISODE_TITLE_FILES])
+
+OUT_OF_CORE = out_of_core.OUT_OF_CORE_ENABLED
+load_plan = None if OUT_OF_CORE else get_load_plan()
+# Modo reducido: conteos pre-agregados por bloques y episodios cargados por serie
+REDUCED_MEMORY = OUT_OF_CORE or load_plan.degraded
+
 # Cargar los datos para ambos gráficos
-df_main = load_main_data()
-imdb_episodios = load_episode_ratings_data()
+if REDUCED_MEMORY:
+    aggregates = load_aggregates()
+    df_main = pd.DataFrame()
+    main_loaded = aggregates is not None
+    imdb_episodios = load_rated_series_titles()
+else:
+    aggregates = None
+    df_main = load_main_data()
+    main_loaded = not df_main.empty
+    imdb_episodios = load_episode_ratings_data()
+
+# Versión de los datos para invalidar las figuras guardadas en la caché de disco
+DATA_VERSION = figure_cache.dataset_version(
+    MAIN_DATA_FILE,
+    *EPISODE_RATING_FILES,
+    *EPISODE_TITLE_FILES
+) + ("-ooc" if REDUCED_MEMORY else "") + ("-lean" if lean_render.LEAN_RENDER else "")
 
 # --- Contenido de la Página de Episodios por Temporada ---
 st.title("Análisis Detallado de Series y Episodios")
 st.markdown("Explora la estructura de temporadas y la evolución de las calificaciones de episodios.")
 
+if load_plan is not None and load_plan.degraded:
+    st.warning(
+        "La carga completa de los datos de episodios superaría la memoria disponible para la aplicación, "
+        "por lo que esta página funciona en **modo reducido**: los conteos por temporada vienen pre-agregados "
+        "y los episodios se cargan solo para la serie seleccionada."
+    )
+
+
+# --- SECCIÓN 1: Cantidad de Episodios por Temporada ---
+@timing.section("episodios", "episodios_por_temporada")
+def render_episodes_per_season_section(selected_series_title, selected_series_tconst_main):
+    st.markdown("---")
+    st.header("Cantidad de Episodios por Temporada")
+
+    def build_episodes_per_season_figure():
+        if REDUCED_MEMORY:
+            # Conteos por temporada ya acumulados durante la pasada por bloques
+            episodes_per_season = out_of_core.season_counts_for_series(aggregates, selected_series_tconst_main)
+            if episodes_per_season.empty:
+                return None
+        else:
+            episodes_data_for_count_chart = df_main[
+                (df_main['tconst'] == selected_series_tconst_main) &
+                (df_main['episodeTconst'].notna()) &
+                (df_main['runtimeMinutes'].notna())
+            ]
+            if episodes_data_for_count_chart.empty:
+                return None
+
+            episodes_per_season = episodes_data_for_count_chart.groupby('seasonNumber').size().reset_index(name='Cantidad de Episodios')
+            episodes_per_season.rename(columns={'seasonNumber': 'Temporada'}, inplace=True)
+        episodes_per_season['Temporada'] = episodes_per_season['Temporada'].astype(str)
+
+        fig_episodes_per_season = px.bar(
+            episodes_per_season,
+            x='Temporada',
+            y='Cantidad de Episodios',
+            title=f'Cantidad de Episodios por Temporada de "{selected_series_title}"',
+            labels={'Temporada': 'Temporada', 'Cantidad de Episodios': 'Cantidad de Episodios'},
+            color_discrete_sequence=px.colors.qualitative.Pastel
+        )
+
+        fig_episodes_per_season.update_layout(
+            xaxis_title="Temporada",
+            yaxis_title="Cantidad de Episodios",
+            hovermode="x unified",
+            font=dict(size=12)
+        )
+        return fig_episodes_per_season
+
+    fig_episodes_per_season = figure_cache.cached_figure(
+        "episodios", "episodios_por_temporada",
+        {"serie": selected_series_tconst_main},
+        DATA_VERSION, build_episodes_per_season_figure
+    )
+
+    if fig_episodes_per_season is not None:
+        lean_render.show_chart(fig_episodes_per_season, "episodios", "episodios_por_temporada")
+    else:
+        st.info(f"No se encontraron datos de episodios por temporada para la serie '{selected_series_title}'.")
+
+
+# --- SECCIÓN 2: Calificaciones de Episodios por Temporada ---
+@timing.section("episodios", "calificaciones_por_temporada")
+def render_episode_ratings_section(selected_series_title):
+    st.markdown("---")
+    st.header("Calificaciones de Episodios por Temporada")
+
+    if REDUCED_MEMORY:
+        df_selected_series_ratings_filtered = load_series_episode_ratings(selected_series_title)
+    else:
+        df_selected_series_ratings_filtered = filter_series_episode_ratings(selected_series_title)
+
+    if not df_selected_series_ratings_filtered.empty:
+        season_numbers_ratings = sorted(df_selected_series_ratings_filtered['seasonNumber'].unique().tolist())
+        selected_season_ratings = st.selectbox(
+            f"Selecciona una Temporada para {selected_series_title} (Calificaciones):",
+            season_numbers_ratings,
+            index=0,
+            key='select_season_for_ratings_chart' # Clave única
+        )
+
+        def build_ratings_figure():
+            df_selected_season_ratings = df_selected_series_ratings_filtered[
+                df_selected_series_ratings_filtered['seasonNumber'] == selected_season_ratings
+            ].copy()
+
+            df_selected_season_ratings['episodeNumber'] = pd.to_numeric(df_selected_season_ratings['episodeNumber'], errors='coerce')
+            df_selected_season_ratings['episode_averageRating'] = pd.to_numeric(df_selected_season_ratings['episode_averageRating'], errors='coerce')
+
+            df_selected_season_ratings.dropna(subset=['episodeNumber', 'episode_averageRating'], inplace=True)
+            df_selected_season_ratings.sort_values(by='episodeNumber', inplace=True)
+            df_selected_season_ratings.reset_index(drop=True, inplace=True)
+
+            if df_selected_season_ratings.empty:
+                return None
+
+            def get_rating_category(rating):
+                if rating >= 7.0: return 'Alto'
+                elif 4.0 <= rating <= 6.9: return 'Normal'
+                else: return 'Bajo'
+
+            df_selected_season_ratings['rating_category'] = df_selected_season_ratings['episode_averageRating'].apply(get_rating_category)
+
+            category_colors = {
+                'Alto': '#2CA02C',   # Verde
+                'Normal': '#FF7F0E', # Naranja
+                'Bajo': '#D62728'    # Rojo
+            }
+
+            fig_ratings = go.Figure()
+
+            if lean_render.LEAN_RENDER:
+                # Un trazo por color (segmentos separados por NaN) en lugar de uno por segmento,
+                # y tooltip con plantilla en lugar de un texto armado por punto
+                df_selected_season_ratings = lean_render.compact_frame(
+                    df_selected_season_ratings,
+                    ['episodeNumber', 'episode_averageRating', 'episode_numVotes', 'rating_category']
+                )
+                episode_x = df_selected_season_ratings['episodeNumber'].to_numpy(dtype=float)
+                episode_y = df_selected_season_ratings['episode_averageRating'].to_numpy()
+                categories = df_selected_season_ratings['rating_category'].to_numpy()
+
+                for category, segment_color in category_colors.items():
+                    segment_end = np.flatnonzero(categories[1:] == category) + 1
+                    if len(segment_end) == 0:
+                        continue
+                    gaps = np.full(len(segment_end), np.nan)
+                    fig_ratings.add_trace(go.Scatter(
+                        x=np.column_stack([episode_x[segment_end - 1], episode_x[segment_end], gaps]).ravel(),
+                        y=np.column_stack([episode_y[segment_end - 1], episode_y[segment_end], gaps]).ravel(),
+                        mode='lines',
+                        line=dict(color=segment_color, width=2.5),
+                        showlegend=False,
+                        hoverinfo='skip'
+                    ))
+
+                category_codes = {'Bajo': 0, 'Normal': 1, 'Alto': 2}
+                fig_ratings.add_trace(go.Scatter(
+                    x=df_selected_season_ratings['episodeNumber'],
+                    y=df_selected_season_ratings['episode_averageRating'],
+                    mode='markers',
+                    marker=dict(
+                        size=10,
+                        color=df_selected_season_ratings['rating_category'].map(category_codes).to_numpy(dtype='int8'),
+                        colorscale=[[0, category_colors['Bajo']], [0.5, category_colors['Normal']], [1, category_colors['Alto']]],
+                        cmin=0,
+                        cmax=2,
+                        line=dict(width=0.5, color='DarkSlateGrey')
+                    ),
+                    name='Calificación de Episodios',
+                    text=categories,
+                    customdata=df_selected_season_ratings['episode_numVotes'],
+                    hovertemplate=(
+                        "Episodio: %{x}<br>"
+                        "Calificación: %{y:.1f} (%{text})<br>"
+                        "Votos: %{customdata:,}<extra></extra>"
+                    )
+                ))
+            else:
+                marker_colors = []
+                if len(df_selected_season_ratings) > 0:
+                    # Usar .item() para extraer el valor de una Serie de un solo elemento
+                    marker_colors.append(category_colors.get(df_selected_season_ratings.iloc[0]['rating_category'], 'grey'))
+
+                for i in range(1, len(df_selected_season_ratings)):
+                    episode_prev = df_selected_season_ratings.iloc[i-1]
+                    episode_curr = df_selected_season_ratings.iloc[i]
+
+                    # Usar .item() para extraer el valor de una Serie de un solo elemento
+                    segment_color = category_colors.get(episode_curr['rating_category'], 'grey')
+                    marker_colors.append(segment_color)
+
+                    fig_ratings.add_trace(go.Scatter(
+                        x=[episode_prev['episodeNumber'], episode_curr['episodeNumber']],
+                        y=[episode_prev['episode_averageRating'], episode_curr['episode_averageRating']],
+                        mode='lines',
+                        line=dict(color=segment_color, width=2.5),
+                        showlegend=False,
+                        hoverinfo='skip'
+                    ))
+
+                fig_ratings.add_trace(go.Scatter(
+                    x=df_selected_season_ratings['episodeNumber'],
+                    y=df_selected_season_ratings['episode_averageRating'],
+                    mode='markers',
+                    marker=dict(
+                        size=10,
+                        color=marker_colors,
+                        line=dict(width=0.5, color='DarkSlateGrey')
+                    ),
+                    name='Calificación de Episodios',
+                    hoverinfo='text',
+                    hovertext=[
+                        f"Episodio: {row['episodeNumber']}<br>"
+                        f"Calificación: {row['episode_averageRating']:.1f} ({row['rating_category']})<br>"
+                        f"Votos: {row['episode_numVotes']:,}"
+                        for index, row in df_selected_season_ratings.iterrows()
+                    ]
+                ))
+
+            fig_ratings.update_layout(
+                title_text=f'Calificaciones de Episodios - {selected_series_title} Temporada {selected_season_ratings}',
+                xaxis_title='Número de Episodio',
+                yaxis_title='Calificación Promedio (1-10)',
+                yaxis_range=[0, 10],
+                yaxis_dtick=1,
+                xaxis_dtick=1,
+                plot_bgcolor='rgba(0,0,0,0)',
+                font=dict(color='DarkSlateGrey'),
+                xaxis=dict(showgrid=False, zeroline=False),
+                yaxis=dict(showgrid=True, gridcolor='LightGrey', zeroline=False),
+                title_font_size=20,
+                hoverlabel=dict(bgcolor='rgba(46, 52, 64, 0.8)', font_size=13, font_family="Arial", bordercolor='grey', font=dict(color='white'))
+            )
+            return fig_ratings
+
+        fig_ratings = figure_cache.cached_figure(
+            "episodios", "calificaciones_por_temporada",
+            {"serie": selected_series_title, "temporada": selected_season_ratings},
+            DATA_VERSION, build_ratings_figure
+        )
+
+        if fig_ratings is not None:
+            lean_render.show_chart(fig_ratings, "episodios", "calificaciones_por_temporada")
+
+            st.markdown(
+                """
+                <p style='font-size: small; color: grey;'>
+                Este gráfico muestra la calificación de cada episodio dentro de la temporada seleccionada.<br>
+                La línea y los puntos se colorean según el rango de rating del episodio:
+                <span style='color:#2CA02C; font-weight:bold;'>Verde para 'Alto' (7.0-10)</span>,
+                <span style='color:#FF7F0E; font-weight:bold;'>Naranja para 'Normal' (4.0-6.9)</span>, y
+                <span style='color:#D62728; font-weight:bold;'>Rojo para 'Bajo' (1.0-3.9)</span>.
+                </p>
+                """,
+                unsafe_allow_html=True
+            )
+
+        else:
+            st.info(f"No se encontraron episodios con calificaciones para la **Temporada {selected_season_ratings}** de **{selected_series_title}**.")
+    else:
+        st.warning(f"No se encontraron datos de episodios con calificaciones para la serie '{selected_series_title}'.")
+
+
 # --- Lógica para el SELECTBOX ÚNICO de Serie ---
-if not df_main.empty and not imdb_episodios.empty:
+if main_loaded and not imdb_episodios.empty:
     # 1. Obtener series con episodios para el gráfico de CONTEO
-    series_for_count_chart = df_main[
-        (df_main['titleType'] == 'tvSeries') &
-        (df_main['episodeTconst'].notna())
-    ].drop_duplicates(subset=['tconst'])
+    if REDUCED_MEMORY:
+        series_with_episodes = aggregates.season_counts.index.get_level_values(0).unique()
+        series_for_count_chart = aggregates.series[
+            aggregates.series['tconst'].isin(series_with_episodes)
+        ].drop_duplicates(subset=['tconst'])
+    else:
+        series_for_count_chart = df_main[
+            (df_main['titleType'] == 'tvSeries') &
+            (df_main['episodeTconst'].notna())
+        ].drop_duplicates(subset=['tconst'])
 
     # 2. Obtener series con calificaciones de episodios para el gráfico de RATINGS
     series_for_ratings_chart = imdb_episodios.drop_duplicates(subset=['series_primaryTitle'])
@@ -159,162 +471,8 @@ if not df_main.empty and not imdb_episodios.empty:
             series_num_votes = series_info['numVotes']
             st.markdown(f"**Calificación Promedio de la Serie:** {series_rating:.1f} ⭐ (Basado en {series_num_votes:,} votos)")
 
-            # --- SECCIÓN 1: Cantidad de Episodios por Temporada ---
-            st.markdown("---")
-            st.header("Cantidad de Episodios por Temporada")
-
-            episodes_data_for_count_chart = df_main[
-                (df_main['tconst'] == selected_series_tconst_main) &
-                (df_main['episodeTconst'].notna()) &
-                (df_main['runtimeMinutes'].notna())
-            ].copy()
-
-            if not episodes_data_for_count_chart.empty:
-                episodes_per_season = episodes_data_for_count_chart.groupby('seasonNumber').size().reset_index(name='Cantidad de Episodios')
-                episodes_per_season.rename(columns={'seasonNumber': 'Temporada'}, inplace=True)
-                episodes_per_season['Temporada'] = episodes_per_season['Temporada'].astype(str)
-
-                fig_episodes_per_season = px.bar(
-                    episodes_per_season,
-                    x='Temporada',
-                    y='Cantidad de Episodios',
-                    title=f'Cantidad de Episodios por Temporada de "{selected_series_title}"',
-                    labels={'Temporada': 'Temporada', 'Cantidad de Episodios': 'Cantidad de Episodios'},
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-
-                fig_episodes_per_season.update_layout(
-                    xaxis_title="Temporada",
-                    yaxis_title="Cantidad de Episodios",
-                    hovermode="x unified",
-                    font=dict(size=12)
-                )
-
-                st.plotly_chart(fig_episodes_per_season, use_container_width=True)
-            else:
-                st.info(f"No se encontraron datos de episodios por temporada para la serie '{selected_series_title}'.")
-
-
-            # --- SECCIÓN 2: Calificaciones de Episodios por Temporada ---
-            st.markdown("---")
-            st.header("Calificaciones de Episodios por Temporada")
-
-            df_selected_series_ratings_filtered = imdb_episodios[
-                imdb_episodios['series_primaryTitle'] == selected_series_title
-            ].copy()
-
-            if not df_selected_series_ratings_filtered.empty:
-                season_numbers_ratings = sorted(df_selected_series_ratings_filtered['seasonNumber'].unique().tolist())
-                selected_season_ratings = st.selectbox(
-                    f"Selecciona una Temporada para {selected_series_title} (Calificaciones):",
-                    season_numbers_ratings,
-                    index=0,
-                    key='select_season_for_ratings_chart' # Clave única
-                )
-
-                df_selected_season_ratings = df_selected_series_ratings_filtered[
-                    df_selected_series_ratings_filtered['seasonNumber'] == selected_season_ratings
-                ].copy()
-
-                df_selected_season_ratings['episodeNumber'] = pd.to_numeric(df_selected_season_ratings['episodeNumber'], errors='coerce')
-                df_selected_season_ratings['episode_averageRating'] = pd.to_numeric(df_selected_season_ratings['episode_averageRating'], errors='coerce')
-
-                df_selected_season_ratings.dropna(subset=['episodeNumber', 'episode_averageRating'], inplace=True)
-                df_selected_season_ratings.sort_values(by='episodeNumber', inplace=True)
-                df_selected_season_ratings.reset_index(drop=True, inplace=True)
-
-                if not df_selected_season_ratings.empty:
-
-                    def get_rating_category(rating):
-                        if rating >= 7.0: return 'Alto'
-                        elif 4.0 <= rating <= 6.9: return 'Normal'
-                        else: return 'Bajo'
-
-                    df_selected_season_ratings['rating_category'] = df_selected_season_ratings['episode_averageRating'].apply(get_rating_category)
-
-                    category_colors = {
-                        'Alto': '#2CA02C',   # Verde
-                        'Normal': '#FF7F0E', # Naranja
-                        'Bajo': '#D62728'    # Rojo
-                    }
-
-                    fig_ratings = go.Figure()
-
-                    marker_colors = []
-                    if len(df_selected_season_ratings) > 0:
-                        # Usar .item() para extraer el valor de una Serie de un solo elemento
-                        marker_colors.append(category_colors.get(df_selected_season_ratings.iloc[0]['rating_category'], 'grey'))
-
-                    for i in range(1, len(df_selected_season_ratings)):
-                        episode_prev = df_selected_season_ratings.iloc[i-1]
-                        episode_curr = df_selected_season_ratings.iloc[i]
-
-                        # Usar .item() para extraer el valor de una Serie de un solo elemento
-                        segment_color = category_colors.get(episode_curr['rating_category'], 'grey')
-                        marker_colors.append(segment_color)
-
-                        fig_ratings.add_trace(go.Scatter(
-                            x=[episode_prev['episodeNumber'], episode_curr['episodeNumber']],
-                            y=[episode_prev['episode_averageRating'], episode_curr['episode_averageRating']],
-                            mode='lines',
-                            line=dict(color=segment_color, width=2.5),
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
-
-                    fig_ratings.add_trace(go.Scatter(
-                        x=df_selected_season_ratings['episodeNumber'],
-                        y=df_selected_season_ratings['episode_averageRating'],
-                        mode='markers',
-                        marker=dict(
-                            size=10,
-                            color=marker_colors,
-                            line=dict(width=0.5, color='DarkSlateGrey')
-                        ),
-                        name='Calificación de Episodios',
-                        hoverinfo='text',
-                        hovertext=[
-                            f"Episodio: {row['episodeNumber']}<br>"
-                            f"Calificación: {row['episode_averageRating']:.1f} ({row['rating_category']})<br>"
-                            f"Votos: {row['episode_numVotes']:,}"
-                            for index, row in df_selected_season_ratings.iterrows()
-                        ]
-                    ))
-
-                    fig_ratings.update_layout(
-                        title_text=f'Calificaciones de Episodios - {selected_series_title} Temporada {selected_season_ratings}',
-                        xaxis_title='Número de Episodio',
-                        yaxis_title='Calificación Promedio (1-10)',
-                        yaxis_range=[0, 10],
-                        yaxis_dtick=1,
-                        xaxis_dtick=1,
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        font=dict(color='DarkSlateGrey'),
-                        xaxis=dict(showgrid=False, zeroline=False),
-                        yaxis=dict(showgrid=True, gridcolor='LightGrey', zeroline=False),
-                        title_font_size=20,
-                        hoverlabel=dict(bgcolor='rgba(46, 52, 64, 0.8)', font_size=13, font_family="Arial", bordercolor='grey', font=dict(color='white'))
-                    )
-
-                    st.plotly_chart(fig_ratings, use_container_width=True)
-
-                    st.markdown(
-                        """
-                        <p style='font-size: small; color: grey;'>
-                        Este gráfico muestra la calificación de cada episodio dentro de la temporada seleccionada.<br>
-                        La línea y los puntos se colorean según el rango de rating del episodio:
-                        <span style='color:#2CA02C; font-weight:bold;'>Verde para 'Alto' (7.0-10)</span>,
-                        <span style='color:#FF7F0E; font-weight:bold;'>Naranja para 'Normal' (4.0-6.9)</span>, y
-                        <span style='color:#D62728; font-weight:bold;'>Rojo para 'Bajo' (1.0-3.9)</span>.
-                        </p>
-                        """,
-                        unsafe_allow_html=True
-                    )
-
-                else:
-                    st.info(f"No se encontraron episodios con calificaciones para la **Temporada {selected_season_ratings}** de **{selected_series_title}**.")
-            else:
-                st.warning(f"No se encontraron datos de episodios con calificaciones para la serie '{selected_series_title}'.")
+            render_episodes_per_season_section(selected_series_title, selected_series_tconst_main)
+            render_episode_ratings_section(selected_series_title)
 
         else: 
             st.info("Por favor, selecciona una serie para ver sus datos de episodios.")
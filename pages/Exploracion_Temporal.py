@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from utils import lean_render, out_of_core, runtime_stats, timing
+
 # --- Configuración de la página ---
 st.set_page_config(
     page_title="IMDb: Exploración Temporal",
@@ -19,12 +21,15 @@ load_css("style.css")
 st.sidebar.image("images/IMDB_Logo_2016.png", width=280) 
 st.sidebar.markdown("¡Explora más en la [Página Oficial de IMDb](https://www.imdb.com/)!")
 
+DATA_FILE = 'data/imdb_dataset.csv'
+
 # --- Función para cargar los datos (con caché para eficiencia) ---
 @st.cache_data
 def load_data():
     try:
-        df = pd.read_csv('data/imdb_dataset.csv', encoding='utf-8')
+        df = pd.read_csv(DATA_FILE, encoding='utf-8')
         df['startYear'] = pd.to_numeric(df['startYear'], errors='coerce')
+        df['runtimeMinutes'] = pd.to_numeric(df['runtimeMinutes'], errors='coerce')
         df['averageRating'] = pd.to_numeric(df['averageRating'], errors='coerce')
         df['numVotes'] = pd.to_numeric(df['numVotes'], errors='coerce')
 
@@ -39,8 +44,34 @@ def load_data():
         st.info("Asegúrate de que el archivo CSV esté en la carpeta principal de tu proyecto.")
         return pd.DataFrame()
 
+# --- Modo out-of-core: agregados calculados por bloques, sin cargar el dataset completo ---
+OUT_OF_CORE = out_of_core.OUT_OF_CORE_ENABLED
+
+# Sin caché propia: los agregados se comparten con las demás páginas desde out_of_core
+def load_aggregates():
+    try:
+        return out_of_core.load_catalog_aggregates(DATA_FILE)
+    except FileNotFoundError:
+        st.error(f"Error: El archivo '{DATA_FILE}' no se encontró.")
+        st.info("Asegúrate de que el archivo CSV esté en la carpeta principal de tu proyecto.")
+        return None
+
 # Cargar los datos
-df_combined = load_data()
+if OUT_OF_CORE:
+    aggregates = load_aggregates()
+    df_combined = pd.DataFrame()
+    data_loaded = aggregates is not None
+else:
+    aggregates = None
+    df_combined = load_data()
+    data_loaded = not df_combined.empty
+
+# --- Estadísticas de duración por (intervalo, género, año, tipo), calculadas una sola vez ---
+@st.cache_data
+def load_runtime_stats():
+    if OUT_OF_CORE:
+        return aggregates.runtime_stats
+    return runtime_stats.build_runtime_stats(df_combined)
 
 # --- Mapeo de nombres originales a nombres amigables para la interfaz ---
 NAME_MAP = {
@@ -51,13 +82,18 @@ NAME_MAP = {
 # --- Contenido de la Página de Exploración Temporal ---
 
 
-if not df_combined.empty:
+# --- SECCIÓN 1: PUNTUACIÓN DE GÉNEROS POR AÑO ---
+@timing.section("exploracion_temporal", "generos_por_anio")
+def render_genre_yearly_section():
     # --- FILTROS DE LA PÁGINA PRINCIPAL (¡Movidos aquí!) ---
     st.header("Puntuación de Géneros por Año")
     st.markdown("Analiza cómo las calificaciones promedio de géneros específicos han evolucionado a lo largo de los años.")
 
     # Selectbox para Tipo de Título (Películas, Series, Todos)
-    title_type_options_original = df_combined['titleType'].unique().tolist()
+    if OUT_OF_CORE:
+        title_type_options_original = aggregates.title_types
+    else:
+        title_type_options_original = df_combined['titleType'].unique().tolist()
     title_type_display_options = ["Todos"] + [NAME_MAP.get(tt, tt) for tt in title_type_options_original]
     title_type_display_options.sort(key=lambda x: (
         0 if x == "Todos" else 1 if x == "Películas" else 2 if x == "Series" else 3
@@ -72,7 +108,6 @@ if not df_combined.empty:
 
     # Filtrar el DataFrame según el tipo de título seleccionado
     if selected_title_display_type == "Todos":
-        df_filtered_by_type = df_combined.copy()
         selected_title_internal_type = "Todos"
     else:
         selected_title_internal_type = ""
@@ -82,11 +117,18 @@ if not df_combined.empty:
                 break
         if not selected_title_internal_type:
             selected_title_internal_type = selected_title_display_type
-        df_filtered_by_type = df_combined[df_combined['titleType'] == selected_title_internal_type].copy()
 
-    # Multiselect para Géneros (Máximo 5)
-    all_genres = df_filtered_by_type['genres'].dropna().str.split(',').explode().unique()
-    all_genres_sorted = sorted(all_genres)
+    if OUT_OF_CORE:
+        all_genres_sorted = out_of_core.genres_for_type(aggregates, selected_title_internal_type)
+    else:
+        if selected_title_internal_type == "Todos":
+            df_filtered_by_type = df_combined.copy()
+        else:
+            df_filtered_by_type = df_combined[df_combined['titleType'] == selected_title_internal_type].copy()
+
+        # Multiselect para Géneros (Máximo 5)
+        all_genres = df_filtered_by_type['genres'].dropna().str.split(',').explode().unique()
+        all_genres_sorted = sorted(all_genres)
 
     selected_genres = st.multiselect( # Ya no es st.sidebar.multiselect
         'Selecciona hasta 5 géneros:',
@@ -98,30 +140,43 @@ if not df_combined.empty:
 
     # --- LÓGICA Y VISUALIZACIÓN DEL GRÁFICO DE LÍNEAS ---
     if selected_genres:
-        df_plot = df_filtered_by_type[
-            df_filtered_by_type['genres'].apply(
-                lambda x: any(g in str(x).split(',') for g in selected_genres) if pd.notna(x) else False
-            )
-        ].copy()
+        if OUT_OF_CORE:
+            # Promedios a partir de las sumas y conteos acumulados por bloque
+            genre_yearly_avg_rating = out_of_core.genre_yearly_stats(aggregates, selected_title_internal_type, selected_genres)
+            genre_yearly_avg_rating.rename(columns={'genres': 'Género', 'averageRating': 'Calificación Promedio'}, inplace=True)
+        else:
+            df_plot = df_filtered_by_type[
+                df_filtered_by_type['genres'].apply(
+                    lambda x: any(g in str(x).split(',') for g in selected_genres) if pd.notna(x) else False
+                )
+            ].copy()
 
-        if not df_plot.empty:
-            df_plot_exploded = df_plot.assign(genres=df_plot['genres'].str.split(',')).explode('genres')
-            df_plot_exploded = df_plot_exploded[df_plot_exploded['genres'].isin(selected_genres)]
+            genre_yearly_avg_rating = pd.DataFrame()
+            if not df_plot.empty:
+                df_plot_exploded = df_plot.assign(genres=df_plot['genres'].str.split(',')).explode('genres')
+                df_plot_exploded = df_plot_exploded[df_plot_exploded['genres'].isin(selected_genres)]
 
-            genre_yearly_avg_rating = df_plot_exploded.groupby(['startYear', 'genres'])['averageRating'].mean().reset_index()
-            genre_yearly_avg_rating.rename(columns={'genres': 'Género', 'averageRating': 'Calificación Promedio'}, inplace=True)
+                genre_yearly_avg_rating = df_plot_exploded.groupby(['startYear', 'genres'])['averageRating'].mean().reset_index()
+                genre_yearly_avg_rating.rename(columns={'genres': 'Género', 'averageRating': 'Calificación Promedio'}, inplace=True)
 
-            genre_yearly_counts = df_plot_exploded.groupby(['startYear', 'genres']).size().reset_index(name='count')
-            genre_yearly_counts.rename(columns={'genres': 'Género'}, inplace=True)
+                genre_yearly_counts = df_plot_exploded.groupby(['startYear', 'genres']).size().reset_index(name='count')
+                genre_yearly_counts.rename(columns={'genres': 'Género'}, inplace=True)
 
-            genre_yearly_avg_rating = pd.merge(genre_yearly_avg_rating, genre_yearly_counts, on=['startYear', 'Género'], how='left')
+                genre_yearly_avg_rating = pd.merge(genre_yearly_avg_rating, genre_yearly_counts, on=['startYear', 'Género'], how='left')
 
+        if not genre_yearly_avg_rating.empty:
             MIN_TITLES_FOR_AVERAGE = 10
             genre_yearly_avg_rating_filtered = genre_yearly_avg_rating[
                 genre_yearly_avg_rating['count'] >= MIN_TITLES_FOR_AVERAGE
             ]
 
             if not genre_yearly_avg_rating_filtered.empty:
+                if lean_render.LEAN_RENDER:
+                    genre_yearly_avg_rating_filtered = lean_render.compact_frame(
+                        genre_yearly_avg_rating_filtered,
+                        ['startYear', 'Calificación Promedio', 'Género', 'count']
+                    )
+
                 fig = px.line(
                     genre_yearly_avg_rating_filtered,
                     x='startYear',
@@ -144,7 +199,7 @@ if not df_combined.empty:
                 )
                 fig.update_yaxes(range=[1, 10])
 
-                st.plotly_chart(fig, use_container_width=True)
+                lean_render.show_chart(fig, "exploracion_temporal", "generos_por_anio")
             else:
                 st.warning(f"No hay suficientes datos (mínimo {MIN_TITLES_FOR_AVERAGE} títulos por año/género) para los géneros seleccionados en el rango de años para '{selected_title_display_type}'. Intenta seleccionar otros géneros.")
         else:
@@ -152,14 +207,19 @@ if not df_combined.empty:
     else:
         st.info("Por favor, selecciona al menos un género para ver el gráfico de líneas.")
 
-    # --- NUEVO GRÁFICO DE LÍNEAS: COMPARACIÓN PELÍCULAS VS SERIES POR RANGO DE AÑOS ---
-    st.markdown("---") 
+
+# --- SECCIÓN 2: COMPARACIÓN PELÍCULAS VS SERIES POR RANGO DE AÑOS ---
+@timing.section("exploracion_temporal", "peliculas_vs_series")
+def render_type_comparison_section():
     st.header("Puntuación Promedio Anual (Películas vs. Series)")
     st.markdown("Compara cómo han evolucionado las calificaciones promedio de películas y series a lo largo de los años en un rango de tiempo específico.")
 
     # Obtener el rango de años disponible en los datos
-    min_year = int(df_combined['startYear'].min())
-    max_year = int(df_combined['startYear'].max())
+    if OUT_OF_CORE:
+        min_year, max_year = out_of_core.year_range(aggregates)
+    else:
+        min_year = int(df_combined['startYear'].min())
+        max_year = int(df_combined['startYear'].max())
 
     # Contenedor para los selectores de año (para que aparezcan uno al lado del otro si hay espacio)
     col1, col2 = st.columns(2)
@@ -183,19 +243,23 @@ if not df_combined.empty:
     if start_year > end_year:
         st.warning("El Año de Inicio no puede ser posterior al Año de Término. Por favor, ajusta tu selección.")
     else:
-        # Filtrar el DataFrame para el rango de años y solo para películas y series
-        df_comparison_years = df_combined[
-            (df_combined['startYear'] >= start_year) &
-            (df_combined['startYear'] <= end_year) &
-            (df_combined['titleType'].isin(['movie', 'tvSeries']))
-        ].copy()
-
-        if not df_comparison_years.empty:
+        if OUT_OF_CORE:
+            yearly_avg_comparison = out_of_core.type_yearly_stats(aggregates, start_year, end_year, ['movie', 'tvSeries'])
+        else:
+            # Filtrar el DataFrame para el rango de años y solo para películas y series
+            df_comparison_years = df_combined[
+                (df_combined['startYear'] >= start_year) &
+                (df_combined['startYear'] <= end_year) &
+                (df_combined['titleType'].isin(['movie', 'tvSeries']))
+            ].copy()
+
             # Calcular la calificación promedio por año y tipo de título
             # También contamos el número de títulos para posibles filtros de datos escasos
             yearly_avg_comparison = df_comparison_years.groupby(['startYear', 'titleType'])['averageRating'].agg(
                 ['mean', 'count']
             ).reset_index()
+
+        if not yearly_avg_comparison.empty:
             yearly_avg_comparison.rename(columns={'mean': 'Calificación Promedio', 'titleType': 'Tipo de Título'}, inplace=True)
 
             # Mapear 'movie'/'tvSeries' a 'Películas'/'Series'
@@ -211,6 +275,12 @@ if not df_combined.empty:
                     "Series": "#E34A33"     # Naranja/Rojo
                 }
 
+                if lean_render.LEAN_RENDER:
+                    yearly_avg_comparison_filtered = lean_render.compact_frame(
+                        yearly_avg_comparison_filtered,
+                        ['startYear', 'Calificación Promedio', 'Tipo de Título', 'count']
+                    )
+
                 # Crear el gráfico de líneas comparativo
                 fig_comparison = px.line(
                     yearly_avg_comparison_filtered,
@@ -239,10 +309,127 @@ if not df_combined.empty:
                 # Ajustar el rango del eje Y
                 fig_comparison.update_yaxes(range=[1, 10])
 
-                st.plotly_chart(fig_comparison, use_container_width=True)
+                lean_render.show_chart(fig_comparison, "exploracion_temporal", "peliculas_vs_series")
             else:
                 st.warning(f"No hay suficientes datos (mínimo {MIN_TITLES_COMPARISON} títulos por año/formato) para los años seleccionados ({start_year}-{end_year}). Ajusta tu rango de años o reduce el umbral de datos.")
         else:
             st.warning(f"No se encontraron datos de películas o series para el rango de años {start_year}-{end_year}. Por favor, ajusta los años seleccionados.")
+
+
+# --- SECCIÓN 3: DURACIÓN DE LOS TÍTULOS ---
+@timing.section("exploracion_temporal", "duracion")
+def render_runtime_section():
+    st.header("Duración de los Títulos")
+    st.markdown("Explora cómo se relaciona la duración con la calificación y cómo ha cambiado la duración promedio a lo largo de los años, por género y tipo de título.")
+
+    runtime_table = load_runtime_stats()
+    if runtime_table is None or runtime_table.empty:
+        st.warning("No hay datos de duración disponibles.")
+        return
+    runtime_years = runtime_table.index.get_level_values('startYear')
+    runtime_types = sorted(runtime_table.index.get_level_values('titleType').unique())
+
+    col_types, col_genres = st.columns(2)
+    with col_types:
+        selected_runtime_types = st.multiselect(
+            "Tipos de título:",
+            options=runtime_types,
+            default=[tt for tt in NAME_MAP if tt in runtime_types] or runtime_types[:1],
+            format_func=lambda tt: NAME_MAP.get(tt, tt),
+            key='runtime_types_multiselect'
+        )
+    with col_genres:
+        selected_runtime_genres = st.multiselect(
+            "Géneros (hasta 5):",
+            options=[runtime_stats.ALL] + runtime_stats.available_genres(runtime_table),
+            default=[runtime_stats.ALL],
+            max_selections=5,
+            key='runtime_genres_multiselect'
+        )
+    runtime_year_range = st.slider(
+        "Rango de años:",
+        min_value=int(runtime_years.min()),
+        max_value=int(runtime_years.max()),
+        value=(int(runtime_years.min()), int(runtime_years.max())),
+        key='runtime_years_slider'
+    )
+
+    if not selected_runtime_types or not selected_runtime_genres:
+        st.info("Por favor, selecciona al menos un tipo de título y un género.")
+        return
+
+    MIN_TITLES_FOR_RUNTIME = 10
+    runtime_filters = (selected_runtime_types, selected_runtime_genres, runtime_year_range)
+    curve_labels = {'mean': 'Calificación Promedio', 'std': 'Desviación Estándar', 'count': 'Títulos', 'genre': 'Género', 'titleType': 'Tipo de Título'}
+
+    # --- Calificación promedio según la duración ---
+    rating_curves = runtime_stats.rating_by_runtime(runtime_table, *runtime_filters)
+    rating_curves = rating_curves[rating_curves['count'] >= MIN_TITLES_FOR_RUNTIME]
+    if not rating_curves.empty:
+        rating_curves = rating_curves.assign(titleType=rating_curves['titleType'].map(lambda tt: NAME_MAP.get(tt, tt)))
+        if lean_render.LEAN_RENDER:
+            rating_curves = lean_render.compact_frame(rating_curves, ['genre', 'titleType', 'runtimeMinutes', 'mean', 'std', 'count'])
+
+        fig_runtime_rating = px.line(
+            rating_curves,
+            x='runtimeMinutes',
+            y='mean',
+            color='genre',
+            line_dash='titleType',
+            markers=True,
+            title='Calificación Promedio según la Duración',
+            labels={**curve_labels, 'runtimeMinutes': 'Duración (minutos)'},
+            hover_data={'std': ':.2f', 'count': ':,d'}
+        )
+        fig_runtime_rating.update_layout(
+            xaxis_title="Duración (minutos)",
+            yaxis_title="Calificación Promedio IMDb",
+            legend_title_text='Género, Tipo',
+            font=dict(size=12)
+        )
+        fig_runtime_rating.update_yaxes(range=[1, 10])
+        lean_render.show_chart(fig_runtime_rating, "exploracion_temporal", "duracion_calificacion")
+        st.caption(f"Intervalos de {runtime_stats.RUNTIME_BIN_MINUTES} minutos; el último agrupa los títulos de {runtime_stats.MAX_RUNTIME} minutos o más. Se omiten los intervalos con menos de {MIN_TITLES_FOR_RUNTIME} títulos.")
+    else:
+        st.warning(f"No hay suficientes datos (mínimo {MIN_TITLES_FOR_RUNTIME} títulos por intervalo de duración) para los filtros seleccionados.")
+
+    # --- Duración promedio por año ---
+    runtime_trends = runtime_stats.runtime_by_year(runtime_table, *runtime_filters)
+    runtime_trends = runtime_trends[runtime_trends['count'] >= MIN_TITLES_FOR_RUNTIME]
+    if not runtime_trends.empty:
+        runtime_trends = runtime_trends.assign(titleType=runtime_trends['titleType'].map(lambda tt: NAME_MAP.get(tt, tt)))
+        if lean_render.LEAN_RENDER:
+            runtime_trends = lean_render.compact_frame(runtime_trends, ['genre', 'titleType', 'startYear', 'mean', 'std', 'count'])
+
+        fig_runtime_year = px.line(
+            runtime_trends,
+            x='startYear',
+            y='mean',
+            color='genre',
+            line_dash='titleType',
+            title='Duración Promedio por Año',
+            labels={**curve_labels, 'startYear': 'Año', 'mean': 'Duración Promedio (min)'},
+            hover_data={'std': ':.1f', 'count': ':,d'}
+        )
+        fig_runtime_year.update_layout(
+            xaxis_title="Año de Lanzamiento",
+            yaxis_title="Duración Promedio (minutos)",
+            hovermode="x unified",
+            legend_title_text='Género, Tipo',
+            font=dict(size=12)
+        )
+        lean_render.show_chart(fig_runtime_year, "exploracion_temporal", "duracion_por_anio")
+    else:
+        st.warning(f"No hay suficientes datos (mínimo {MIN_TITLES_FOR_RUNTIME} títulos por año) para los filtros seleccionados.")
+
+
+if data_loaded:
+    render_genre_yearly_section()
+
+    st.markdown("---") 
+    render_type_comparison_section()
+
+    st.markdown("---") 
+    render_runtime_section()
 else:
     st.error("No se pudieron cargar los datos. Por favor, verifica la ruta del archivo CSV y que no esté vacío.")
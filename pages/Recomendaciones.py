@@ -0,0 +1,144 @@
+import time
+
+import streamlit as st
+import pandas as pd
+
+from utils import out_of_core, similarity, timing
+
+# --- Configuración de la página ---
+st.set_page_config(
+    page_title="IMDb: Recomendaciones",
+    page_icon="images/IMDB_Logo_2016.png",
+    layout="wide"
+)
+
+def load_css(file_name):
+    with open(file_name, encoding="utf-8") as f:
+        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+
+load_css("style.css")
+
+
+st.sidebar.image("images/IMDB_Logo_2016.png", width=280)
+st.sidebar.markdown("¡Explora más en la [Página Oficial de IMDb](https://www.imdb.com/)!")
+
+DATA_FILE = 'data/imdb_dataset.csv'
+OUT_OF_CORE = out_of_core.OUT_OF_CORE_ENABLED
+
+# --- Índice de similitud (se construye una sola vez por proceso y se comparte entre sesiones) ---
+@st.cache_resource
+def load_similarity_index():
+    try:
+        if OUT_OF_CORE:
+            # Por bloques: solo se conservan los títulos con votos suficientes para entrar al índice
+            df = pd.concat([
+                chunk[chunk['numVotes'] >= similarity.INDEX_MIN_VOTES]
+                for chunk in map(out_of_core.clean_main_chunk, out_of_core.iter_chunks(DATA_FILE, out_of_core.MAIN_COLUMNS))
+            ], ignore_index=True)
+        else:
+            df = pd.read_csv(DATA_FILE, encoding='utf-8')
+            df['startYear'] = pd.to_numeric(df['startYear'], errors='coerce')
+            df['runtimeMinutes'] = pd.to_numeric(df['runtimeMinutes'], errors='coerce')
+            df['averageRating'] = pd.to_numeric(df['averageRating'], errors='coerce')
+            df['numVotes'] = pd.to_numeric(df['numVotes'], errors='coerce')
+            df.dropna(subset=['startYear', 'averageRating', 'genres'], inplace=True)
+            df['startYear'] = df['startYear'].astype(int)
+        return similarity.build_similarity_index(df)
+    except FileNotFoundError:
+        st.error(f"Error: El archivo '{DATA_FILE}' no se encontró.")
+        st.info("Asegúrate de que el archivo CSV esté en la carpeta principal de tu proyecto.")
+        return None
+
+similarity_index = load_similarity_index()
+data_loaded = similarity_index is not None and not similarity_index.titles.empty
+
+# --- Mapeo de nombres originales a nombres amigables para la interfaz ---
+NAME_MAP = {
+    "movie": "Películas",
+    "tvSeries": "Series"
+}
+
+# --- Contenido de la Página de Recomendaciones ---
+st.title("¿Qué Ver Esta Noche?")
+st.markdown("Elige un título que te haya gustado y encuentra otros parecidos según sus géneros, década, duración y calificación.")
+
+
+def title_label(row):
+    return f"{row.primaryTitle} ({row.startYear}, {NAME_MAP.get(row.titleType, row.titleType)})"
+
+
+# --- SECCIÓN 1: TÍTULOS SIMILARES ---
+@timing.section("recomendaciones", "titulos_similares")
+def render_similar_titles_section():
+    search_text = st.text_input(
+        "Busca un título:",
+        placeholder="Por ejemplo: Breaking Bad",
+        key='recommendation_search'
+    )
+    matches = similarity.search(similarity_index, search_text.strip())
+    if len(matches) == 0:
+        st.warning(f"No se encontraron títulos que contengan '{search_text}'. Intenta con otro nombre.")
+        return
+
+    # Las opciones son las filas del índice: dos títulos con la misma etiqueta siguen siendo distintos
+    titles = similarity_index.titles
+    selected_row = st.selectbox(
+        "Selecciona el título:",
+        options=[int(row) for row in matches],
+        format_func=lambda row: title_label(titles.iloc[row]),
+        index=0,
+        key='recommendation_title_select'
+    )
+
+    col_k, col_votes, col_type = st.columns(3)
+    with col_k:
+        n_recommendations = st.slider(
+            "Cantidad de recomendaciones:",
+            min_value=5,
+            max_value=30,
+            value=10,
+            key='recommendation_k_slider'
+        )
+    with col_votes:
+        min_votes = st.slider(
+            "Mínimo de votos:",
+            min_value=similarity.INDEX_MIN_VOTES,
+            max_value=100000,
+            value=1000,
+            step=100,
+            key='recommendation_votes_slider'
+        )
+    with col_type:
+        same_type = st.checkbox(
+            "Solo del mismo tipo (película, serie, ...)",
+            value=True,
+            key='recommendation_same_type'
+        )
+
+    start = time.perf_counter()
+    rows, _ = similarity.nearest(similarity_index, selected_row, n_recommendations, min_votes, same_type)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    rows = rows[0][rows[0] >= 0]
+
+    if len(rows) == 0:
+        st.warning("No hay títulos con suficientes votos para recomendar. Intenta reducir el mínimo de votos.")
+        return
+
+    selected_title = similarity_index.titles.iloc[selected_row]
+    st.subheader(f"Si te gustó {selected_title['primaryTitle']}, podrías ver:")
+    recommendations = similarity_index.titles.iloc[rows]
+    st.dataframe(
+        recommendations.assign(titleType=recommendations['titleType'].map(lambda tt: NAME_MAP.get(tt, tt))).rename(columns={
+            'primaryTitle': 'Título', 'titleType': 'Tipo', 'startYear': 'Año', 'runtimeMinutes': 'Duración (min)',
+            'genres': 'Géneros', 'averageRating': 'Calificación', 'numVotes': 'Votos'
+        }).drop(columns=['tconst']),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"Comparado con {len(similarity_index.titles):,} títulos en {elapsed_ms:.0f} ms.")
+
+
+if data_loaded:
+    render_similar_titles_section()
+else:
+    st.error("No se pudieron cargar los datos. Por favor, verifica la ruta del archivo CSV y que no esté vacío.")
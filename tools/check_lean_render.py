@@ -0,0 +1,42 @@
+# tools/check_lean_render.py
+"""Comprobación rápida de la conversión a WebGL del modo lean render.
+
+Convierte figuras de Plotly Express (que traen propiedades como `orientation`,
+no válidas en Scattergl) y verifica que las trazas grandes pasen a WebGL, y que
+una figura sin caché por encima del presupuesto se advierta con el log en su
+nivel por defecto (WARNING):
+
+    python tools/check_lean_render.py
+"""
+import logging
+import os
+import sys
+
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import lean_render  # noqa: E402
+
+
+def main():
+    x = list(range(50))
+    for build in (px.line, px.scatter):
+        fig = lean_render.use_webgl(build(x=x, y=x, color=[i % 2 for i in x]), min_points=10)
+        assert all(trace.type == 'scattergl' for trace in fig.data), build.__name__
+        fig = lean_render.use_webgl(build(x=x, y=x), min_points=100)
+        assert all(trace.type == 'scatter' for trace in fig.data), build.__name__
+    print("use_webgl: OK")
+
+    warnings = []
+    handler = logging.Handler(level=logging.WARNING)
+    handler.emit = warnings.append
+    lean_render.logger.addHandler(handler)
+    lean_render.CHECK_BUDGET, lean_render.PAYLOAD_BUDGET_BYTES = True, 1
+    lean_render.show_chart(px.line(x=x, y=x), "check", "budget")
+    assert lean_render.logger.getEffectiveLevel() > logging.INFO and warnings, "show_chart"
+    print("show_chart: OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+# tools/load_test.py
+"""Prueba de carga con sesiones simultáneas simuladas sobre las páginas.
+
+Copia la aplicación a un directorio temporal con datos sintéticos, y para cada
+nivel de concurrencia lanza N sesiones de `AppTest` en paralelo. Cada sesión abre
+una página e interactúa al azar con sus widgets (series, temporadas, sliders,
+multiselect de géneros). Se reporta la latencia de cada rerun (p50/p95/p99), la
+memoria del proceso (RSS) y el tamaño de las cachés. Cada nivel arranca con las
+cachés vacías, para que los resultados de distintos niveles sean comparables.
+No necesita conexión:
+
+    python tools/load_test.py --levels 1,2,4,8 --interactions 5
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from synthetic_data import write_synthetic_dataset
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILES = ['Explorador.py', 'style.css', 'images', 'pages', 'utils']
+PAGES = [
+    'pages/Calificaciones.py', 'pages/Episodios_de_series.py',
+    'pages/Exploracion_Temporal.py', 'pages/Recomendaciones.py'
+]
+
+
+def prepare_app(work_dir, n_titles, n_series, seed):
+    app_dir = os.path.join(work_dir, 'app')
+    os.makedirs(app_dir)
+    for name in APP_FILES:
+        source = os.path.join(ROOT_DIR, name)
+        target = os.path.join(app_dir, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, target, ignore=shutil.ignore_patterns('__pycache__'))
+        else:
+            shutil.copy2(source, target)
+    write_synthetic_dataset(os.path.join(app_dir, 'data'), n_titles, n_series, seed)
+    return app_dir
+
+
+def share_runtime_across_sessions():
+    # AppTest instala y borra un Runtime global en cada run(); con varias sesiones en
+    # hilos, una sesión que termina dejaría sin Runtime a las demás. Se fija uno
+    # compartido por todo el proceso, como el único Runtime de un servidor real.
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    shared_runtime = MagicMock(spec=Runtime)
+    shared_runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared_runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: shared_runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+
+def cache_sizes():
+    from streamlit.runtime.caching import cache_data_api, cache_resource_api
+    from utils import figure_cache
+
+    data_stats = cache_data_api.get_data_cache_stats_provider().get_stats()
+    # Recursos compartidos: índices de similitud y de densidad, rankings ponderados, agregados
+    resource_stats = cache_resource_api.get_resource_cache_stats_provider().get_stats()
+    figures = figure_cache.cache_stats()
+    return {
+        'cache_data_entries': len(data_stats),
+        'cache_data_bytes': sum(stat.byte_length for stat in data_stats),
+        'cache_resource_entries': len(resource_stats),
+        'cache_resource_bytes': sum(stat.byte_length for stat in resource_stats),
+        'figure_cache_entries': figures['entries'],
+        'figure_cache_bytes': figures['bytes'],
+    }
+
+
+def select_index(widget, index):
+    # El navegador envía el índice de la opción elegida; AppTest en cambio lo recalcula
+    # aplicando format_func a la etiqueta, lo que falla cuando las opciones no son texto
+    # (por ejemplo, las filas del índice de similitud). Se envía el índice directamente.
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=widget.id, int_value=index)
+    widget.__class__ = type('IndexSelectbox', (type(widget),), {'_widget_state': property(lambda self: state)})
+
+
+def reset_caches():
+    # Cada nivel arranca en frío, como un proceso recién iniciado: sin las cachés de
+    # Streamlit ni las figuras en disco que dejaron los niveles anteriores
+    import streamlit as st
+    from utils import figure_cache
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    shutil.rmtree(figure_cache.CACHE_DIR, ignore_errors=True)
+    gc.collect()
+
+
+def random_interaction(at, rng):
+    # Elegir un widget visible al azar y darle un valor válido
+    candidates = [w for w in list(at.selectbox) + list(at.multiselect) + list(at.slider) if not w.disabled]
+    if not candidates:
+        return None
+    widget = rng.choice(candidates)
+
+    if widget.type == 'selectbox':
+        if not widget.options:
+            return None
+        select_index(widget, rng.randrange(len(widget.options)))
+    elif widget.type == 'multiselect':
+        if not widget.options:
+            return None
+        limit = widget.max_selections or 5
+        k = rng.randint(min(3, len(widget.options)), min(limit, 5, len(widget.options)))
+        widget.set_value(rng.sample(list(widget.options), k))
+    else:
+        steps = int((widget.max - widget.min) // widget.step)
+        values = [widget.min + rng.randint(0, steps) * widget.step for _ in range(2)]
+        values = [int(v) if float(v).is_integer() else v for v in sorted(values)]
+        # Los sliders de rango reciben dos valores
+        widget.set_value(tuple(values) if isinstance(widget.value, (list, tuple)) else values[0])
+    return widget.key
+
+
+def run_session(session_id, interactions, timeout, seed, latencies, errors, lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(f"{seed}-{session_id}")
+    page = rng.choice(PAGES)
+    at = AppTest.from_file(page, default_timeout=timeout)
+
+    for step in range(interactions + 1):
+        if step > 0 and random_interaction(at, rng) is None:
+            break
+        start = time.perf_counter()
+        try:
+            at.run()
+        except Exception as e:
+            with lock:
+                errors.append(f"{page}: {e}")
+            break
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append((page, elapsed))
+            errors.extend(f"{page}: {exc.value}" for exc in at.exception)
+
+
+def run_level(concurrency, interactions, timeout, seed):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(run_session, f"{concurrency}-{i}", interactions, timeout, seed, latencies, errors, lock)
+            for i in range(concurrency)
+        ]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - start
+
+    from utils import memory_guard
+
+    values = np.array([elapsed for _, elapsed in latencies]) * 1000
+    result = {
+        'concurrency': concurrency,
+        'reruns': len(values),
+        'wall_s': round(wall, 2),
+        'p50_ms': round(float(np.percentile(values, 50)), 1) if len(values) else None,
+        'p95_ms': round(float(np.percentile(values, 95)), 1) if len(values) else None,
+        'p99_ms': round(float(np.percentile(values, 99)), 1) if len(values) else None,
+        'rss_mb': round(memory_guard.current_rss_bytes() / 1024 ** 2, 1),
+        'errors': len(errors),
+    }
+    result.update(cache_sizes())
+    result['per_page_p95_ms'] = {
+        page: round(float(np.percentile([e * 1000 for p, e in latencies if p == page], 95)), 1)
+        for page in sorted({p for p, _ in latencies})
+    }
+    return result, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones simultáneas simuladas.")
+    parser.add_argument('--levels', default='1,2,4,8', help="Niveles de concurrencia separados por coma")
+    parser.add_argument('--interactions', type=int, default=5, help="Interacciones aleatorias por sesión")
+    parser.add_argument('--titles', type=int, default=20000, help="Títulos en el dataset sintético")
+    parser.add_argument('--series', type=int, default=300, help="Series con episodios en el dataset sintético")
+    parser.add_argument('--timeout', type=float, default=120, help="Tiempo máximo por rerun (segundos)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    work_dir = tempfile.mkdtemp(prefix='imdb_load_test_')
+    try:
+        app_dir = prepare_app(work_dir, args.titles, args.series, args.seed)
+        # Las páginas usan rutas relativas al directorio de la app, como con `streamlit run`
+        os.environ['IMDB_FIGURE_CACHE_DIR'] = os.path.join(app_dir, '.figure_cache')
+        os.chdir(app_dir)
+        sys.path.insert(0, app_dir)
+        share_runtime_across_sessions()
+
+        results = []
+        for level in [int(x) for x in args.levels.split(',')]:
+            reset_caches()
+            result, errors = run_level(level, args.interactions, args.timeout, args.seed)
+            results.append(result)
+            print(
+                f"N={result['concurrency']:>3}  reruns={result['reruns']:>4}  "
+                f"p50={result['p50_ms']} ms  p95={result['p95_ms']} ms  p99={result['p99_ms']} ms  "
+                f"RSS={result['rss_mb']} MB  cache_data={result['cache_data_bytes'] / 1024 ** 2:.1f} MB  "
+                f"cache_resource={result['cache_resource_bytes'] / 1024 ** 2:.1f} MB  "
+                f"figuras={result['figure_cache_entries']} ({result['figure_cache_bytes'] / 1024:.0f} KB)  "
+                f"errores={result['errors']}"
+            )
+            for error in errors[:3]:
+                print(f"    {error}")
+
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+    finally:
+        os.chdir(ROOT_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
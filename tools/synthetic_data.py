@@ -0,0 +1,99 @@
+# tools/synthetic_data.py
+"""Genera una carpeta `data/` sintética con la misma estructura que usan las páginas.
+
+Sirve para probar la aplicación sin conexión y sin los archivos reales de IMDb:
+
+    python tools/synthetic_data.py data --titles 50000
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+GENRES = [
+    'Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Documentary',
+    'Drama', 'Family', 'Fantasy', 'History', 'Horror', 'Music', 'Mystery', 'Romance',
+    'Sci-Fi', 'Sport', 'Thriller', 'War', 'Western'
+]
+FEATURED_SERIES = ['Game of Thrones', 'Breaking Bad']
+
+
+def make_titles(n_titles, rng):
+    title_types = rng.choice(['movie', 'tvSeries', 'short', 'tvMovie'], n_titles, p=[0.65, 0.2, 0.1, 0.05])
+    genre_counts = rng.integers(1, 4, n_titles)
+    genres = [','.join(rng.choice(GENRES, k, replace=False)) for k in genre_counts]
+    runtime = rng.normal(95, 30, n_titles).clip(3, 300).round().astype(int).astype(object)
+    runtime[rng.random(n_titles) < 0.03] = '\\N'
+
+    df = pd.DataFrame({
+        'tconst': [f'tt{i:07d}' for i in range(n_titles)],
+        'titleType': title_types,
+        'primaryTitle': [f'Título {i}' for i in range(n_titles)],
+        'startYear': rng.integers(1920, 2025, n_titles),
+        'runtimeMinutes': runtime,
+        'genres': genres,
+        'averageRating': rng.normal(6.5, 1.3, n_titles).clip(1, 10).round(1),
+        'numVotes': rng.lognormal(6, 2, n_titles).clip(5, 2_500_000).astype(int)
+    })
+    featured = df.index[:len(FEATURED_SERIES)]
+    df.loc[featured, 'primaryTitle'] = FEATURED_SERIES
+    df.loc[featured, 'titleType'] = 'tvSeries'
+    df.loc[featured, 'numVotes'] = [2_300_000, 2_100_000]
+    return df
+
+
+def make_episodes(titles, n_series, rng):
+    series = titles[titles['titleType'] == 'tvSeries'].head(n_series)
+    episode_rows = []
+    rating_rows = []
+    for series_row in series.itertuples():
+        for season in range(1, rng.integers(2, 9)):
+            for episode in range(1, rng.integers(6, 14)):
+                episode_rows.append((f'te{len(episode_rows):08d}', series_row.tconst, season, episode))
+                rating_rows.append((
+                    series_row.primaryTitle, season, episode,
+                    round(float(np.clip(rng.normal(series_row.averageRating, 0.8), 1, 10)), 1),
+                    int(rng.lognormal(7, 1.5))
+                ))
+    title_episode = pd.DataFrame(episode_rows, columns=['tconst', 'parentTconst', 'seasonNumber', 'episodeNumber'])
+    episode_ratings = pd.DataFrame(
+        rating_rows,
+        columns=['series_primaryTitle', 'seasonNumber', 'episodeNumber', 'episode_averageRating', 'episode_numVotes']
+    )
+    return title_episode, episode_ratings
+
+
+def _write_parts(df, data_dir, pattern, parts):
+    bounds = np.linspace(0, len(df), parts + 1).astype(int)
+    for i in range(parts):
+        df.iloc[bounds[i]:bounds[i + 1]].to_csv(os.path.join(data_dir, pattern.format(i + 1)), index=False)
+
+
+def write_synthetic_dataset(data_dir, n_titles=20000, n_series=300, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+
+    titles = make_titles(n_titles, rng)
+    titles.to_csv(os.path.join(data_dir, 'imdb_dataset.csv'), index=False)
+
+    title_episode, episode_ratings = make_episodes(titles, n_series, rng)
+    _write_parts(title_episode, data_dir, 'title_parte{}.tsv', 3)
+    _write_parts(episode_ratings, data_dir, 'imdb_episodios_parte{}.csv', 5)
+    return titles, title_episode, episode_ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos con la estructura de la carpeta data/.")
+    parser.add_argument('data_dir')
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--series', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    titles, title_episode, _ = write_synthetic_dataset(args.data_dir, args.titles, args.series, args.seed)
+    print(f"{len(titles):,} títulos y {len(title_episode):,} episodios escritos en {args.data_dir}")
+
+
+if __name__ == '__main__':
+    main()
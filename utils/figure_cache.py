@@ -0,0 +1,164 @@
+# utils/figure_cache.py
+"""Caché en disco de figuras Plotly ya renderizadas.
+
+Las figuras se guardan como JSON en un directorio compartido por todos los
+procesos del servidor, con una clave derivada de (página, sección, estado
+normalizado de los widgets, versión del dataset, versión del código que arma la
+figura). Cuando el tamaño total del directorio supera el límite configurado se
+eliminan las entradas usadas hace más tiempo.
+"""
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+import plotly.io as pio
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Configuración (se puede ajustar con variables de entorno) ---
+CACHE_ENABLED = os.environ.get("IMDB_FIGURE_CACHE", "1") != "0"
+CACHE_DIR = os.environ.get("IMDB_FIGURE_CACHE_DIR", os.path.join(ROOT_DIR, ".figure_cache"))
+MAX_CACHE_BYTES = int(float(os.environ.get("IMDB_FIGURE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# La caché sobrevive a los reinicios: subir este número cuando cambie código que arma
+# figuras fuera de las funciones `build` (p. ej. los intervalos de utils/out_of_core.py).
+# Los cambios dentro de `build` se detectan solos con su código fuente.
+FIGURE_CACHE_VERSION = 1
+
+
+def dataset_version(*paths):
+    """Identificador corto que cambia cuando cambia cualquiera de los archivos de datos."""
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        except OSError:
+            digest.update(f"{path}:missing".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _normalize(value):
+    # Dos estados equivalentes de los widgets deben producir la misma clave
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if hasattr(value, "item"):  # Escalares de numpy
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def builder_version(build):
+    try:
+        source = inspect.getsource(build)
+    except (OSError, TypeError):
+        source = getattr(build, "__qualname__", repr(build))
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def make_key(page, section, widget_state, version, code_version=""):
+    payload = json.dumps(
+        [page, section, _normalize(widget_state), version, FIGURE_CACHE_VERSION, code_version],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get_figure(key):
+    path = _entry_path(key)
+    try:
+        with open(path, encoding="utf-8") as f:
+            fig_json = f.read()
+        # Actualizar la fecha de uso para la política de expulsión LRU
+        os.utime(path, None)
+        fig = pio.from_json(fig_json)
+    except (OSError, ValueError):
+        return None
+    # Tamaño ya conocido: show_chart no necesita volver a serializar la figura
+    fig._payload_bytes = len(fig_json.encode("utf-8"))
+    return fig
+
+
+def put_figure(key, fig):
+    fig_json = fig.to_json()
+    fig._payload_bytes = len(fig_json.encode("utf-8"))
+    if fig._payload_bytes > MAX_CACHE_BYTES:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Escritura atómica: otros procesos nunca ven un archivo a medio escribir
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            tmp.write(fig_json)
+        os.replace(tmp.name, _entry_path(key))
+    except OSError:
+        return
+    _evict()
+
+
+def _evict():
+    try:
+        entries = []
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+
+    total_bytes = sum(size for _, size, _ in entries)
+    if total_bytes <= MAX_CACHE_BYTES:
+        return
+
+    # Eliminar primero las figuras usadas hace más tiempo
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # Otro proceso ya la eliminó
+        total_bytes -= size
+        if total_bytes <= MAX_CACHE_BYTES:
+            break
+
+
+def cache_stats():
+    entries, total_bytes = 0, 0
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    entries += 1
+                    total_bytes += entry.stat().st_size
+    except OSError:
+        pass
+    return {"entries": entries, "bytes": total_bytes}
+
+
+def cached_figure(page, section, widget_state, version, build):
+    """Devuelve la figura cacheada o la construye con `build()` y la guarda.
+
+    `build` puede devolver None cuando no hay datos; ese resultado no se cachea.
+    """
+    if not CACHE_ENABLED:
+        return build()
+
+    key = make_key(page, section, widget_state, version, builder_version(build))
+    fig = get_figure(key)
+    if fig is None:
+        fig = build()
+        if fig is not None:
+            put_figure(key, fig)
+    return fig
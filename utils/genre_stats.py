@@ -0,0 +1,79 @@
+# utils/genre_stats.py
+"""Co-ocurrencia de géneros: cuántos títulos comparten cada par de géneros y su calificación.
+
+La matriz se arma una sola vez a partir de una matriz multi-hot (títulos x géneros)
+con productos matriciales por grupo de (titleType, rango de calificación). Se guarda
+en formato largo con solo los pares presentes, y los filtros de la página se
+resuelven sumando esas filas, sin volver a recorrer los títulos.
+"""
+import numpy as np
+import pandas as pd
+
+PAIR_INDEX = ['titleType', 'rating_range', 'genre_a', 'genre_b']
+
+
+def genre_multi_hot(genres, dtype=np.uint8):
+    # Matriz títulos x géneros a partir de las cadenas "Drama,Romance"
+    split = genres.str.split(',')
+    rows = np.repeat(np.arange(len(genres)), split.str.len().to_numpy())
+    codes, names = pd.factorize(split.explode().to_numpy())
+    matrix = np.zeros((len(genres), len(names)), dtype=dtype)
+    matrix[rows, codes] = 1
+    return matrix, np.asarray(names)
+
+
+def genre_cooccurrence(frame, rating_range):
+    """Conteo y suma de calificaciones por (titleType, rango, género A, género B).
+
+    `rating_range` es el índice de rango de calificación de cada fila de `frame`.
+    """
+    frame = frame.reset_index(drop=True)
+    matrix, names = genre_multi_hot(frame['genres'])
+    ratings = frame['averageRating'].to_numpy(dtype=np.float64)
+    type_codes, type_names = pd.factorize(frame['titleType'])
+    group_keys = type_codes * 100 + np.asarray(rating_range)
+
+    parts = []
+    for key in np.unique(group_keys[type_codes >= 0]):
+        rows = group_keys == key
+        group = matrix[rows].astype(np.float64)
+        counts = group.T @ group
+        rating_sums = group.T @ (group * ratings[rows, None])
+        genre_a, genre_b = np.nonzero(counts)
+        parts.append(pd.DataFrame({
+            'titleType': type_names[key // 100],
+            'rating_range': key % 100,
+            'genre_a': names[genre_a],
+            'genre_b': names[genre_b],
+            'count': counts[genre_a, genre_b].round().astype(np.int64),
+            'rating_sum': rating_sums[genre_a, genre_b].astype(np.float64),
+        }))
+
+    if not parts:
+        return pd.DataFrame(columns=PAIR_INDEX + ['count', 'rating_sum']).set_index(PAIR_INDEX)
+    return pd.concat(parts, ignore_index=True).set_index(PAIR_INDEX)
+
+
+def cooccurrence_matrix(pairs, title_types, rating_ranges, metric='count', min_titles=1):
+    """Matriz género x género para los tipos y rangos seleccionados.
+
+    `metric` es 'count' (cantidad de títulos) o 'mean' (calificación promedio).
+    Las celdas con menos de `min_titles` títulos quedan vacías.
+    """
+    selected = pairs[
+        pairs.index.get_level_values('titleType').isin(title_types) &
+        pairs.index.get_level_values('rating_range').isin(rating_ranges)
+    ]
+    totals = selected.groupby(level=['genre_a', 'genre_b']).sum()
+    if totals.empty:
+        return pd.DataFrame()
+
+    if metric == 'mean':
+        values = totals['rating_sum'] / totals['count']
+    else:
+        values = totals['count'].astype(float)
+    values = values.where(totals['count'] >= min_titles)
+
+    matrix = values.unstack('genre_b')
+    genres = sorted(set(matrix.index) | set(matrix.columns))
+    return matrix.reindex(index=genres, columns=genres)
@@ -0,0 +1,84 @@
+# utils/lean_render.py
+"""Modo "lean render": figuras más livianas para el navegador.
+
+Con el modo activo, las trazas scatter/line con muchos puntos se dibujan con
+WebGL (`Scattergl`), las columnas que no usa el gráfico se eliminan antes de
+llegar a Plotly y los números enteros se envían con el tipo más pequeño posible.
+Con el modo activo (o con un presupuesto definido en `IMDB_FIGURE_BUDGET_KB`) se
+mide el JSON de cada figura tal como se envía, se registra en el log y se advierte
+cuando supera el presupuesto. Sin eso, solo se mide si el log está en nivel INFO.
+"""
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# --- Configuración (se puede ajustar con variables de entorno) ---
+LEAN_RENDER = os.environ.get("IMDB_LEAN_RENDER", "0") == "1"
+WEBGL_MIN_POINTS = int(os.environ.get("IMDB_WEBGL_MIN_POINTS", "1000"))
+PAYLOAD_BUDGET_BYTES = int(float(os.environ.get("IMDB_FIGURE_BUDGET_KB", "512")) * 1024)
+# El presupuesto se controla siempre en modo lean o si se configuró explícitamente
+CHECK_BUDGET = LEAN_RENDER or "IMDB_FIGURE_BUDGET_KB" in os.environ
+
+
+def compact_frame(df, columns):
+    # Solo las columnas que usa el gráfico, con enteros en el tipo más pequeño posible
+    df = df[columns].copy()
+    for column in columns:
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values):
+            df[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values):
+            array = values.to_numpy()
+            # Columnas como numVotes llegan como float por los NaN de to_numeric
+            if np.isfinite(array).all() and np.array_equal(array, np.round(array)):
+                df[column] = pd.to_numeric(values.astype('int64'), downcast='integer')
+    return df
+
+
+def use_webgl(fig, min_points=WEBGL_MIN_POINTS):
+    traces = []
+    changed = False
+    for trace in fig.data:
+        if trace.type == 'scatter' and trace.x is not None and len(trace.x) >= min_points:
+            properties = trace.to_plotly_json()
+            properties.pop('type', None)
+            # Plotly Express agrega propiedades que Scattergl no acepta (p. ej. `orientation`)
+            traces.append(go.Scattergl(properties, skip_invalid=True))
+            changed = True
+        else:
+            traces.append(trace)
+    if changed:
+        fig = go.Figure(data=traces, layout=fig.layout)
+    return fig
+
+
+def figure_payload_bytes(fig):
+    return len(fig.to_json().encode("utf-8"))
+
+
+def show_chart(fig, page, section, **kwargs):
+    if LEAN_RENDER:
+        fig = use_webgl(fig)
+
+    # Se mide la figura que se envía. Las que vienen de la caché de disco y use_webgl no
+    # cambió ya traen el tamaño de su JSON; las demás se serializan para medirlas
+    payload_bytes = getattr(fig, '_payload_bytes', None)
+    if payload_bytes is None and (CHECK_BUDGET or logger.isEnabledFor(logging.INFO)):
+        payload_bytes = figure_payload_bytes(fig)
+
+    if payload_bytes is not None:
+        logger.info("Figura %s/%s: %.1f KB", page, section, payload_bytes / 1024)
+        if payload_bytes > PAYLOAD_BUDGET_BYTES:
+            logger.warning(
+                "La figura %s/%s ocupa %.1f KB, por encima del presupuesto de %.1f KB",
+                page, section, payload_bytes / 1024, PAYLOAD_BUDGET_BYTES / 1024
+            )
+
+    kwargs.setdefault('use_container_width', True)
+    return st.plotly_chart(fig, **kwargs)
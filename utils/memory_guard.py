@@ -0,0 +1,77 @@
+# utils/memory_guard.py
+"""Control de memoria antes de cargar datasets grandes.
+
+Compara la memoria actual del proceso (RSS) más la memoria estimada del dataset
+con un presupuesto configurable. Si la carga completa lo superaría, la página
+debe pasar a un modo reducido (datos agregados y carga por serie) en lugar de
+arriesgarse a que el proceso se quede sin memoria y caigan todas las sesiones.
+"""
+import io
+import logging
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# --- Configuración (se puede ajustar con variables de entorno) ---
+MEMORY_BUDGET_BYTES = int(float(os.environ.get("IMDB_MEMORY_BUDGET_MB", "1024")) * 1024 * 1024)
+# Copias intermedias durante la carga (concat, merge, copy) sobre el tamaño final
+LOAD_PEAK_FACTOR = float(os.environ.get("IMDB_LOAD_PEAK_FACTOR", "2.0"))
+SAMPLE_ROWS = 2000
+
+
+@dataclass
+class LoadPlan:
+    degraded: bool
+    rss_bytes: int
+    estimated_bytes: int
+    budget_bytes: int
+
+    def describe(self):
+        return (
+            f"memoria actual {self.rss_bytes / 1024 ** 2:.0f} MB + "
+            f"estimada {self.estimated_bytes / 1024 ** 2:.0f} MB, "
+            f"presupuesto {self.budget_bytes / 1024 ** 2:.0f} MB"
+        )
+
+
+def current_rss_bytes():
+    try:
+        with open('/proc/self/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss es el máximo (no el actual) y viene en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def estimate_csv_footprint(path, sample_rows=SAMPLE_ROWS):
+    # Memoria en pandas por byte en disco, medida sobre las primeras filas del archivo
+    try:
+        file_bytes = os.path.getsize(path)
+        with open(path, encoding='utf-8') as f:
+            sample = ''.join(line for _, line in zip(range(sample_rows + 1), f))
+    except OSError:
+        return 0
+    sample_bytes = len(sample.encode('utf-8'))
+    if sample_bytes == 0:
+        return 0
+    sample_df = pd.read_csv(io.StringIO(sample))
+    memory_per_disk_byte = sample_df.memory_usage(deep=True).sum() / sample_bytes
+    return int(file_bytes * memory_per_disk_byte)
+
+
+def plan_load(paths, budget_bytes=MEMORY_BUDGET_BYTES):
+    rss = current_rss_bytes()
+    estimated = int(sum(estimate_csv_footprint(path) for path in paths) * LOAD_PEAK_FACTOR)
+    plan = LoadPlan(rss + estimated > budget_bytes, rss, estimated, budget_bytes)
+    if plan.degraded:
+        logger.warning("Carga completa por sobre el presupuesto (%s): modo reducido", plan.describe())
+    else:
+        logger.info("Carga completa dentro del presupuesto (%s)", plan.describe())
+    return plan
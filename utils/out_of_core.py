@@ -0,0 +1,364 @@
+# utils/out_of_core.py
+"""Modo "out-of-core": agregados de las páginas calculados en una sola pasada por bloques.
+
+En lugar de cargar `imdb_dataset.csv` y las tablas de episodios completas en
+memoria, se leen por bloques de `CHUNK_ROWS` filas y cada bloque se reduce a
+tablas pequeñas (sumas y conteos) que se acumulan. La memoria queda acotada por
+el tamaño de un bloque más el tamaño de los agregados, y cada bloque deja un
+registro (`ChunkStats`) con lo leído, lo conservado y la memoria usada. La pasada
+se hace una vez por proceso (`load_catalog_aggregates`) y todas las páginas y
+sesiones consultan el mismo resultado.
+"""
+import heapq
+import logging
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import genre_stats, runtime_stats
+
+logger = logging.getLogger(__name__)
+
+# --- Configuración (se puede ajustar con variables de entorno) ---
+OUT_OF_CORE_ENABLED = os.environ.get("IMDB_OUT_OF_CORE", "0") == "1"
+CHUNK_ROWS = int(os.environ.get("IMDB_CHUNK_ROWS", "200000"))
+MAX_STATE_BYTES = int(float(os.environ.get("IMDB_OUT_OF_CORE_STATE_MB", "256")) * 1024 * 1024)
+
+MAIN_COLUMNS = ['tconst', 'titleType', 'primaryTitle', 'startYear', 'runtimeMinutes', 'genres', 'averageRating', 'numVotes']
+EPISODE_COLUMNS = ['parentTconst', 'seasonNumber', 'episodeNumber']
+# Lo que necesita la página de episodios del archivo principal (sin runtimeMinutes)
+SERIES_COLUMNS = ['tconst', 'titleType', 'primaryTitle', 'startYear', 'genres', 'averageRating', 'numVotes']
+SERIES_FIELDS = ['tconst', 'primaryTitle', 'averageRating', 'numVotes']
+
+# Histograma: intervalos de 0.5 cerrados a la izquierda desde 1.0; el último, [10.0, 10.5),
+# contiene los 10. El modo normal le pasa los mismos bordes a px.histogram (xbins) en lugar
+# de nbins, que plotly.js redondea a un tamaño "redondo" y desplaza según los datos.
+RATING_BIN_SIZE = 0.5
+RATING_BIN_EDGES = np.arange(1.0, 10.5 + RATING_BIN_SIZE / 2, RATING_BIN_SIZE)
+
+# Rangos del gráfico de torta: "1.0 - 2.0", "2.1 - 3.0", ..., "9.1 - 10.0"
+RATING_RANGES = [
+    "1.0 - 2.0", "2.1 - 3.0", "3.1 - 4.0", "4.1 - 5.0",
+    "5.1 - 6.0", "6.1 - 7.0", "7.1 - 8.0", "8.1 - 9.0", "9.1 - 10.0"
+]
+
+TOP_N = 30
+MIN_VOTES_FOR_TOP = 100  # Valor mínimo del slider del Top 30
+
+
+@dataclass
+class ChunkStats:
+    source: str
+    chunk: int
+    rows_read: int
+    rows_kept: int
+    chunk_bytes: int
+    state_bytes: int
+
+
+@dataclass
+class CatalogAggregates:
+    title_types: list = field(default_factory=list)
+    # (startYear, titleType) -> sum, count de averageRating
+    year_type: pd.DataFrame = None
+    # (startYear, titleType, genre) -> sum, count de averageRating
+    year_genre_type: pd.DataFrame = None
+    # (titleType, rating_bin) -> cantidad de títulos
+    rating_hist: pd.Series = None
+    # (titleType, genre, rating_range) -> cantidad de títulos
+    genre_rating_range: pd.Series = None
+    # (titleType, rating_range, genre_a, genre_b) -> count, rating_sum
+    genre_pairs: pd.DataFrame = None
+    # (runtime_bin, genre, startYear, titleType) -> conteo, sumas y sumas de cuadrados
+    runtime_stats: pd.DataFrame = None
+    # Filas que pueden aparecer en el Top N para algún umbral de votos
+    top_candidates: pd.DataFrame = None
+    # Series (tconst, primaryTitle, averageRating, numVotes)
+    series: pd.DataFrame = None
+    # (parentTconst, seasonNumber) -> cantidad de episodios
+    season_counts: pd.Series = None
+    chunk_stats: list = field(default_factory=list)
+
+
+def rating_bin(ratings):
+    return np.clip(np.searchsorted(RATING_BIN_EDGES, ratings, side='right') - 1, 0, len(RATING_BIN_EDGES) - 2)
+
+
+def rating_range_index(ratings):
+    # 1.0-2.0 -> 0, 2.1-3.0 -> 1, ..., 9.1-10.0 -> 8
+    return np.clip(np.ceil(ratings) - 2, 0, len(RATING_RANGES) - 1).astype(int)
+
+
+def clean_main_chunk(chunk):
+    # Misma limpieza que load_data() de las páginas
+    for column in ('startYear', 'runtimeMinutes', 'averageRating', 'numVotes'):
+        if column in chunk:
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce')
+    chunk.dropna(subset=['startYear', 'averageRating', 'genres'], inplace=True)
+    chunk['startYear'] = chunk['startYear'].astype(int)
+    return chunk
+
+
+def iter_chunks(path, columns, sep=','):
+    return pd.read_csv(
+        path,
+        sep=sep,
+        usecols=lambda c: c in columns,
+        na_values=['\\N'],
+        chunksize=CHUNK_ROWS,
+        encoding='utf-8'
+    )
+
+
+def _accumulate(acc, partial):
+    if acc is None:
+        return partial
+    return acc.add(partial, fill_value=0)
+
+
+def _frame_bytes(obj):
+    if obj is None:
+        return 0
+    usage = obj.memory_usage(deep=True)
+    return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+
+
+def top_candidates(frame, n=TOP_N):
+    # Una fila puede entrar al Top N para el umbral "votos >= v" solo si hay menos de N
+    # filas mejor ordenadas con al menos sus votos. Se recorre por votos descendentes
+    # manteniendo un heap con las N mejores (calificación, votos) vistas hasta ese punto.
+    frame = frame[frame['numVotes'] >= MIN_VOTES_FOR_TOP]
+    kept = []
+    for _, group in frame.groupby('titleType', sort=False):
+        group = group.sort_values(['numVotes', 'averageRating'], ascending=[False, False])
+        keep_mask = np.zeros(len(group), dtype=bool)
+        heap = []
+        ratings = group['averageRating'].to_numpy()
+        votes = group['numVotes'].to_numpy()
+        for i in range(len(group)):
+            item = (ratings[i], votes[i])
+            if len(heap) < n:
+                heapq.heappush(heap, item)
+                keep_mask[i] = True
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+                keep_mask[i] = True
+        kept.append(group[keep_mask])
+    if not kept:
+        return frame.iloc[0:0]
+    return pd.concat(kept, ignore_index=True)
+
+
+def aggregate_main(path):
+    agg = CatalogAggregates()
+    title_types = set()
+    candidate_columns = ['tconst', 'titleType', 'primaryTitle', 'startYear', 'genres', 'averageRating', 'numVotes']
+
+    for i, chunk in enumerate(iter_chunks(path, MAIN_COLUMNS)):
+        rows_read = len(chunk)
+        chunk_bytes = _frame_bytes(chunk)
+        chunk = clean_main_chunk(chunk)
+        title_types.update(chunk['titleType'].dropna().unique().tolist())
+
+        ratings = chunk['averageRating'].to_numpy()
+        agg.year_type = _accumulate(
+            agg.year_type,
+            chunk.groupby(['startYear', 'titleType'])['averageRating'].agg(['sum', 'count'])
+        )
+        agg.rating_hist = _accumulate(
+            agg.rating_hist,
+            chunk.groupby([chunk['titleType'], rating_bin(ratings)]).size()
+        )
+
+        exploded = chunk[['startYear', 'titleType', 'genres', 'averageRating']].assign(
+            genres=chunk['genres'].str.split(','),
+            rating_range=rating_range_index(ratings)
+        ).explode('genres')
+        agg.year_genre_type = _accumulate(
+            agg.year_genre_type,
+            exploded.groupby(['startYear', 'titleType', 'genres'])['averageRating'].agg(['sum', 'count'])
+        )
+        agg.genre_rating_range = _accumulate(
+            agg.genre_rating_range,
+            exploded.groupby(['titleType', 'genres', 'rating_range']).size()
+        )
+        agg.genre_pairs = _accumulate(
+            agg.genre_pairs,
+            genre_stats.genre_cooccurrence(chunk, rating_range_index(ratings))
+        )
+        agg.runtime_stats = _accumulate(
+            agg.runtime_stats,
+            runtime_stats.build_runtime_stats(chunk)
+        )
+
+        pool = chunk[candidate_columns].dropna(subset=['numVotes'])
+        if agg.top_candidates is not None:
+            pool = pd.concat([agg.top_candidates, pool], ignore_index=True)
+        agg.top_candidates = top_candidates(pool)
+
+        series = chunk.loc[chunk['titleType'] == 'tvSeries', SERIES_FIELDS]
+        agg.series = series if agg.series is None else pd.concat([agg.series, series], ignore_index=True)
+
+        state_bytes = sum(_frame_bytes(obj) for obj in (
+            agg.year_type, agg.year_genre_type, agg.rating_hist,
+            agg.genre_rating_range, agg.genre_pairs, agg.runtime_stats, agg.top_candidates, agg.series
+        ))
+        _record_chunk(agg, ChunkStats(os.path.basename(path), i, rows_read, len(chunk), chunk_bytes, state_bytes))
+
+    agg.title_types = sorted(title_types)
+    return agg
+
+
+def aggregate_series(path):
+    # Solo las series: sin los agregados del catálogo, que la página de episodios no usa
+    agg = CatalogAggregates()
+    parts = []
+    state_bytes = 0
+    for i, chunk in enumerate(iter_chunks(path, SERIES_COLUMNS)):
+        rows_read = len(chunk)
+        chunk_bytes = _frame_bytes(chunk)
+        chunk = clean_main_chunk(chunk)
+        series = chunk.loc[chunk['titleType'] == 'tvSeries', SERIES_FIELDS]
+        parts.append(series)
+        state_bytes += _frame_bytes(series)
+        _record_chunk(agg, ChunkStats(os.path.basename(path), i, rows_read, len(series), chunk_bytes, state_bytes))
+    agg.series = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=SERIES_FIELDS)
+    return agg
+
+
+def aggregate_season_counts(paths, agg):
+    for path in paths:
+        for i, chunk in enumerate(iter_chunks(path, EPISODE_COLUMNS)):
+            rows_read = len(chunk)
+            chunk_bytes = _frame_bytes(chunk)
+            chunk['seasonNumber'] = pd.to_numeric(chunk['seasonNumber'], errors='coerce')
+            chunk['episodeNumber'] = pd.to_numeric(chunk['episodeNumber'], errors='coerce')
+            chunk.dropna(subset=['parentTconst', 'seasonNumber', 'episodeNumber'], inplace=True)
+            chunk['seasonNumber'] = chunk['seasonNumber'].astype(int)
+
+            agg.season_counts = _accumulate(
+                agg.season_counts,
+                chunk.groupby(['parentTconst', 'seasonNumber']).size()
+            )
+            _record_chunk(agg, ChunkStats(os.path.basename(path), i, rows_read, len(chunk), chunk_bytes, _frame_bytes(agg.season_counts)))
+    return agg
+
+
+def _record_chunk(agg, stats):
+    agg.chunk_stats.append(stats)
+    logger.info(
+        "%s bloque %d: %d filas leídas, %d conservadas, %.1f MB bloque, %.1f MB agregados",
+        stats.source, stats.chunk, stats.rows_read, stats.rows_kept,
+        stats.chunk_bytes / 1024 ** 2, stats.state_bytes / 1024 ** 2
+    )
+    if stats.state_bytes > MAX_STATE_BYTES:
+        logger.warning(
+            "Los agregados ocupan %.1f MB, por encima del límite de %.1f MB",
+            stats.state_bytes / 1024 ** 2, MAX_STATE_BYTES / 1024 ** 2
+        )
+
+
+def build_aggregates(main_path, episode_paths=()):
+    agg = aggregate_main(main_path)
+    if episode_paths:
+        aggregate_season_counts(episode_paths, agg)
+    return agg
+
+
+# --- Agregados compartidos por todas las páginas y sesiones ---
+
+@st.cache_resource(show_spinner="Agregando el catálogo por bloques...")
+def load_catalog_aggregates(main_path):
+    # Una sola pasada por proceso sobre el archivo principal. Se devuelve el mismo
+    # objeto a todas las páginas, que solo lo consultan (ninguna consulta lo modifica).
+    return aggregate_main(main_path)
+
+
+@st.cache_resource(show_spinner="Agregando los episodios por bloques...")
+def load_episode_aggregates(main_path, episode_paths):
+    # Solo `series` y `season_counts`, lo único que consulta la página de episodios
+    return aggregate_season_counts(episode_paths, aggregate_series(main_path))
+
+
+# --- Consultas sobre los agregados (equivalentes a los cálculos de las páginas) ---
+
+def _histogram_frame(counts):
+    centers = (RATING_BIN_EDGES[:-1] + RATING_BIN_EDGES[1:]) / 2
+    return pd.DataFrame({'averageRating': centers, 'count': np.asarray(counts).astype(int)})
+
+
+def rating_histogram(agg, title_type="Todos"):
+    counts = agg.rating_hist
+    if title_type != "Todos":
+        counts = counts[counts.index.get_level_values(0) == title_type]
+    counts = counts.groupby(level=1).sum().reindex(range(len(RATING_BIN_EDGES) - 1), fill_value=0)
+    return _histogram_frame(counts.to_numpy())
+
+
+def rating_histogram_from_values(ratings):
+    counts = np.bincount(rating_bin(np.asarray(ratings)), minlength=len(RATING_BIN_EDGES) - 1)
+    return _histogram_frame(counts)
+
+
+def genres_in_rating_range(agg, range_index):
+    counts = agg.genre_rating_range
+    counts = counts[counts.index.get_level_values(2) == range_index]
+    return sorted(counts.index.get_level_values(1).unique())
+
+
+def genre_counts_in_rating_range(agg, range_index, genres):
+    counts = agg.genre_rating_range
+    counts = counts[
+        (counts.index.get_level_values(2) == range_index) &
+        (counts.index.get_level_values(1).isin(genres))
+    ]
+    return counts.groupby(level=1).sum().astype(int).sort_values(ascending=False)
+
+
+def top_n(agg, title_type, min_votes, n=TOP_N):
+    candidates = agg.top_candidates
+    candidates = candidates[(candidates['titleType'] == title_type) & (candidates['numVotes'] >= min_votes)]
+    return candidates.sort_values(by=['averageRating', 'numVotes'], ascending=[False, False]).head(n)
+
+
+def genres_for_type(agg, title_type="Todos"):
+    stats = agg.year_genre_type
+    if title_type != "Todos":
+        stats = stats[stats.index.get_level_values(1) == title_type]
+    return sorted(stats.index.get_level_values(2).unique())
+
+
+def genre_yearly_stats(agg, title_type, genres):
+    stats = agg.year_genre_type
+    if title_type != "Todos":
+        stats = stats[stats.index.get_level_values(1) == title_type]
+    stats = stats[stats.index.get_level_values(2).isin(genres)]
+    stats = stats.groupby(level=[0, 2]).sum()
+    stats['averageRating'] = stats['sum'] / stats['count']
+    return stats.reset_index()[['startYear', 'genres', 'averageRating', 'count']]
+
+
+def type_yearly_stats(agg, start_year, end_year, title_types):
+    stats = agg.year_type.reset_index()
+    stats = stats[
+        (stats['startYear'] >= start_year) &
+        (stats['startYear'] <= end_year) &
+        (stats['titleType'].isin(title_types))
+    ].copy()
+    stats['mean'] = stats['sum'] / stats['count']
+    return stats[['startYear', 'titleType', 'mean', 'count']]
+
+
+def year_range(agg):
+    years = agg.year_type.index.get_level_values(0)
+    return int(years.min()), int(years.max())
+
+
+def season_counts_for_series(agg, tconst):
+    counts = agg.season_counts
+    counts = counts[counts.index.get_level_values(0) == tconst]
+    counts = counts.droplevel(0).astype(int)
+    return counts.rename_axis('Temporada').reset_index(name='Cantidad de Episodios')
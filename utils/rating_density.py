@@ -0,0 +1,115 @@
+# utils/rating_density.py
+"""Densidad de títulos en la grilla calificación x votos (escala logarítmica).
+
+Cada título se asigna una sola vez a una celda de la grilla. Con esas celdas ya
+calculadas, el mapa de calor para cualquier combinación de filtros es un
+`np.bincount` sobre las filas que pasan el filtro. Además se guarda un índice de
+las filas ordenadas por celda (y por votos dentro de cada celda), de modo que
+listar los títulos de una celda solo recorre esa celda y no todo el catálogo.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils import genre_stats
+
+RATING_EDGES = np.linspace(1, 10, 46)       # Celdas de 0.2 puntos
+LOG_VOTE_EDGES = np.linspace(0, 7, 36)      # Celdas de 0.2 en log10(votos): de 1 a 10 millones
+N_RATING_BINS = len(RATING_EDGES) - 1
+N_VOTE_BINS = len(LOG_VOTE_EDGES) - 1
+TITLE_COLUMNS = ['tconst', 'primaryTitle', 'titleType', 'startYear', 'genres', 'averageRating', 'numVotes']
+
+
+@dataclass
+class DensityIndex:
+    titles: pd.DataFrame        # Títulos en el orden original de las filas
+    cell: np.ndarray            # Celda de cada fila: rating_bin * N_VOTE_BINS + vote_bin
+    year: np.ndarray
+    type_codes: np.ndarray
+    type_names: np.ndarray
+    genre_bits: np.ndarray      # Bit i encendido si el título tiene el género genre_names[i]
+    genre_names: np.ndarray
+    order: np.ndarray           # Filas ordenadas por celda y, dentro de cada celda, por votos
+    offsets: np.ndarray         # order[offsets[c]:offsets[c + 1]] son las filas de la celda c
+
+
+def bin_index(values, edges):
+    # Celda de cada valor; los valores fuera de los bordes van a la primera o última celda
+    return np.searchsorted(edges[1:-1], values, side='right')
+
+
+def vote_bin_labels():
+    votes = np.round(10 ** LOG_VOTE_EDGES).astype(np.int64)
+    return [f"{votes[i]:,} - {votes[i + 1]:,}" for i in range(N_VOTE_BINS)]
+
+
+def rating_bin_labels():
+    return [f"{RATING_EDGES[i]:.1f} - {RATING_EDGES[i + 1]:.1f}" for i in range(N_RATING_BINS)]
+
+
+def build_density_index(frame):
+    titles = frame.dropna(subset=['averageRating', 'numVotes'])
+    titles = titles[titles['numVotes'] > 0][TITLE_COLUMNS].reset_index(drop=True)
+
+    ratings = titles['averageRating'].to_numpy(dtype=np.float64)
+    votes = titles['numVotes'].to_numpy(dtype=np.float64)
+    cell = (bin_index(ratings, RATING_EDGES) * N_VOTE_BINS + bin_index(np.log10(votes), LOG_VOTE_EDGES)).astype(np.int32)
+
+    matrix, genre_names = genre_stats.genre_multi_hot(titles['genres'].fillna(''))
+    if len(genre_names) > 64:
+        raise ValueError(f"Demasiados géneros para la máscara de bits: {len(genre_names)}")
+    genre_bits = matrix.astype(np.uint64) @ (np.uint64(1) << np.arange(len(genre_names), dtype=np.uint64))
+
+    type_codes, type_names = pd.factorize(titles['titleType'])
+
+    # Orden por celda y, dentro de cada celda, por votos descendente
+    order = np.lexsort((-votes, cell))
+    offsets = np.searchsorted(cell[order], np.arange(N_RATING_BINS * N_VOTE_BINS + 1))
+
+    return DensityIndex(
+        titles=titles,
+        cell=cell,
+        year=titles['startYear'].to_numpy(dtype=np.int32),
+        type_codes=type_codes.astype(np.int16),
+        type_names=np.asarray(type_names),
+        genre_bits=genre_bits,
+        genre_names=genre_names,
+        order=order,
+        offsets=offsets,
+    )
+
+
+def genre_mask(index, genres):
+    # Máscara de bits con los géneros pedidos (0 si no se filtra por género)
+    positions = np.flatnonzero(np.isin(index.genre_names, genres))
+    return np.bitwise_or.reduce(np.uint64(1) << positions.astype(np.uint64), initial=np.uint64(0))
+
+
+def filter_rows(index, title_types, year_range, genres, rows=slice(None)):
+    """Filas (de `rows`) que cumplen los filtros.
+
+    Un título pasa el filtro de géneros si tiene al menos uno de los géneros
+    elegidos; sin géneros elegidos no se filtra por género.
+    """
+    type_codes = np.flatnonzero(np.isin(index.type_names, title_types))
+    year = index.year[rows]
+    mask = np.isin(index.type_codes[rows], type_codes) & (year >= year_range[0]) & (year <= year_range[1])
+    if genres:
+        mask &= (index.genre_bits[rows] & genre_mask(index, genres)) != 0
+    return mask
+
+
+def density_grid(index, title_types, year_range, genres):
+    # Cantidad de títulos por celda: filas = celdas de calificación, columnas = celdas de votos
+    mask = filter_rows(index, title_types, year_range, genres)
+    counts = np.bincount(index.cell[mask], minlength=N_RATING_BINS * N_VOTE_BINS)
+    return counts.reshape(N_RATING_BINS, N_VOTE_BINS)
+
+
+def titles_in_cell(index, rating_bin, vote_bin, title_types, year_range, genres, n=10):
+    # Solo se recorren las filas de la celda, que ya vienen ordenadas por votos
+    c = rating_bin * N_VOTE_BINS + vote_bin
+    rows = index.order[index.offsets[c]:index.offsets[c + 1]]
+    rows = rows[filter_rows(index, title_types, year_range, genres, rows)]
+    return index.titles.iloc[rows[:n]]
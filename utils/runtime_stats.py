@@ -0,0 +1,78 @@
+# utils/runtime_stats.py
+"""Estadísticas de duración (runtimeMinutes) por intervalo de duración, género, año y tipo.
+
+Se arma una sola tabla con conteo, suma y suma de cuadrados de la calificación y
+de la duración por (intervalo de duración, género, año, titleType), en una sola
+pasada agrupada. Como todas las columnas son sumas, la tabla se puede acumular
+por bloques (modo out-of-core) y la media y la varianza de cualquier filtro se
+obtienen sumando las celdas que lo cumplen, sin volver a recorrer los títulos.
+"""
+import numpy as np
+import pandas as pd
+
+ALL = "Todos"               # Género que agrupa a todos los títulos (cada título cuenta una vez)
+RUNTIME_BIN_MINUTES = 10
+MAX_RUNTIME = 240           # El último intervalo agrupa los títulos de MAX_RUNTIME minutos o más
+STATS_INDEX = ['runtime_bin', 'genre', 'startYear', 'titleType']
+STATS_COLUMNS = ['count', 'rating_sum', 'rating_sumsq', 'runtime_sum', 'runtime_sumsq']
+
+
+def runtime_bin(runtime):
+    return np.minimum(np.asarray(runtime) // RUNTIME_BIN_MINUTES, MAX_RUNTIME // RUNTIME_BIN_MINUTES).astype(np.int16)
+
+
+def build_runtime_stats(frame):
+    titles = frame.dropna(subset=['runtimeMinutes', 'averageRating', 'genres', 'titleType'])
+    titles = titles[titles['runtimeMinutes'] > 0]
+    rating = titles['averageRating'].to_numpy(dtype=np.float64)
+    runtime = titles['runtimeMinutes'].to_numpy(dtype=np.float64)
+
+    base = pd.DataFrame({
+        'runtime_bin': runtime_bin(runtime),
+        'startYear': titles['startYear'].to_numpy(),
+        'titleType': titles['titleType'].to_numpy(),
+        'count': 1,
+        'rating_sum': rating,
+        'rating_sumsq': rating ** 2,
+        'runtime_sum': runtime,
+        'runtime_sumsq': runtime ** 2,
+    })
+    by_genre = base.assign(genre=titles['genres'].str.split(',').to_numpy()).explode('genre')
+    return pd.concat([by_genre, base.assign(genre=ALL)], ignore_index=True).groupby(STATS_INDEX)[STATS_COLUMNS].sum()
+
+
+def _select(stats, title_types, genres, year_range):
+    index = stats.index
+    years = index.get_level_values('startYear')
+    return stats[
+        index.get_level_values('titleType').isin(title_types) &
+        index.get_level_values('genre').isin(genres) &
+        (years >= year_range[0]) & (years <= year_range[1])
+    ]
+
+
+def _moments(sums, prefix):
+    # Media y desviación estándar a partir de conteo, suma y suma de cuadrados
+    mean = sums[f'{prefix}_sum'] / sums['count']
+    variance = (sums[f'{prefix}_sumsq'] / sums['count'] - mean ** 2).clip(lower=0)
+    return mean, np.sqrt(variance)
+
+
+def rating_by_runtime(stats, title_types, genres, year_range):
+    # Calificación media por intervalo de duración, una curva por (género, titleType)
+    sums = _select(stats, title_types, genres, year_range).groupby(level=['genre', 'titleType', 'runtime_bin']).sum()
+    sums['mean'], sums['std'] = _moments(sums, 'rating')
+    sums = sums.reset_index()
+    sums['runtimeMinutes'] = sums['runtime_bin'] * RUNTIME_BIN_MINUTES + RUNTIME_BIN_MINUTES / 2
+    return sums[['genre', 'titleType', 'runtimeMinutes', 'mean', 'std', 'count']]
+
+
+def runtime_by_year(stats, title_types, genres, year_range):
+    # Duración media por año, una curva por (género, titleType)
+    sums = _select(stats, title_types, genres, year_range).groupby(level=['genre', 'titleType', 'startYear']).sum()
+    sums['mean'], sums['std'] = _moments(sums, 'runtime')
+    return sums.reset_index()[['genre', 'titleType', 'startYear', 'mean', 'std', 'count']]
+
+
+def available_genres(stats):
+    return sorted(set(stats.index.get_level_values('genre')) - {ALL})
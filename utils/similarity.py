@@ -0,0 +1,102 @@
+# utils/similarity.py
+"""Títulos similares por géneros, década, duración y calificación.
+
+Cada título se representa con un vector de características escaladas (géneros
+multi-hot normalizados, década, duración y calificación), guardado en una matriz
+float32 que se arma una sola vez. Los vecinos más cercanos de uno o varios
+títulos se obtienen con un solo producto matricial contra todo el catálogo y un
+`argpartition`, sin recorrer los títulos uno por uno.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils import genre_stats
+
+# Peso de cada componente: dos títulos con géneros sin nada en común quedan a
+# distancia sqrt(2) * GENRE_WEIGHT; una década, 30 minutos o un punto de
+# calificación de diferencia suman lo indicado en cada escala.
+GENRE_WEIGHT = 1.0
+DECADE_SCALE = 0.15
+RUNTIME_SCALE = 0.15 / 30
+RATING_SCALE = 0.2
+INDEX_MIN_VOTES = 100     # Títulos con menos votos no entran en el índice
+TITLE_COLUMNS = ['tconst', 'primaryTitle', 'titleType', 'startYear', 'runtimeMinutes', 'genres', 'averageRating', 'numVotes']
+
+
+@dataclass
+class SimilarityIndex:
+    titles: pd.DataFrame        # Títulos indexados, ordenados por votos descendente
+    features: np.ndarray        # Matriz títulos x características (float32)
+    squared_norms: np.ndarray   # ||x||² de cada fila, para las distancias
+    votes: np.ndarray
+    type_codes: np.ndarray
+    search_titles: pd.Series    # Títulos en minúsculas para la búsqueda por texto
+
+
+def build_similarity_index(frame, min_votes=INDEX_MIN_VOTES):
+    titles = frame[frame['numVotes'] >= min_votes].dropna(subset=['averageRating', 'genres', 'startYear'])
+    titles = titles[TITLE_COLUMNS].sort_values('numVotes', ascending=False).reset_index(drop=True)
+
+    genres, _ = genre_stats.genre_multi_hot(titles['genres'], dtype=np.float32)
+    genres *= GENRE_WEIGHT / np.sqrt(np.maximum(genres.sum(axis=1, keepdims=True), 1))
+
+    runtime = titles['runtimeMinutes'].to_numpy(dtype=np.float32)
+    runtime = np.where(np.isnan(runtime), np.nanmedian(runtime) if np.isfinite(runtime).any() else 0, runtime)
+    scalars = np.column_stack([
+        (titles['startYear'].to_numpy() // 10) * DECADE_SCALE,
+        runtime * RUNTIME_SCALE,
+        titles['averageRating'].to_numpy() * RATING_SCALE,
+    ]).astype(np.float32)
+    # Centrar las columnas escalares no cambia las distancias y evita perder precisión en float32
+    scalars -= scalars.mean(axis=0)
+
+    features = np.ascontiguousarray(np.hstack([genres, scalars]), dtype=np.float32)
+    return SimilarityIndex(
+        titles=titles,
+        features=features,
+        squared_norms=np.einsum('ij,ij->i', features, features),
+        votes=titles['numVotes'].to_numpy(),
+        type_codes=pd.factorize(titles['titleType'])[0],
+        search_titles=titles['primaryTitle'].str.lower(),
+    )
+
+
+def search(index, text, limit=50):
+    # Filas cuyo título contiene el texto, las más votadas primero (el índice ya está ordenado por votos)
+    if not text:
+        return np.arange(min(limit, len(index.titles)))
+    matches = index.search_titles.str.contains(text.lower(), regex=False).to_numpy()
+    return np.flatnonzero(matches)[:limit]
+
+
+def nearest(index, query_rows, k=10, min_votes=INDEX_MIN_VOTES, same_type=False):
+    """Las `k` filas más cercanas a cada fila de `query_rows`, de la más a la menos similar.
+
+    Devuelve dos matrices (consultas x k): filas y distancias. Si quedan menos de
+    `k` candidatos, las posiciones sobrantes tienen fila -1 y distancia infinita.
+    """
+    query_rows = np.atleast_1d(query_rows)
+    # El índice está ordenado por votos: los candidatos con al menos `min_votes` son un prefijo
+    n_candidates = int(np.searchsorted(-index.votes, -min_votes, side='right'))
+    candidates = index.features[:n_candidates]
+
+    # ||a - b||² = ||a||² + ||b||² - 2 a·b, para todas las consultas a la vez
+    distances = index.squared_norms[None, :n_candidates] - 2 * (index.features[query_rows] @ candidates.T)
+    distances += index.squared_norms[query_rows, None]
+    if same_type:
+        distances[index.type_codes[query_rows, None] != index.type_codes[None, :n_candidates]] = np.inf
+    is_candidate = query_rows < n_candidates
+    distances[np.flatnonzero(is_candidate), query_rows[is_candidate]] = np.inf
+
+    k = min(k, n_candidates)
+    if k == 0:
+        return np.empty((len(query_rows), 0), dtype=np.int64), np.empty((len(query_rows), 0))
+    nearest_rows = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    nearest_distances = np.take_along_axis(distances, nearest_rows, axis=1)
+    order = np.argsort(nearest_distances, axis=1)
+    rows = np.take_along_axis(nearest_rows, order, axis=1)
+    row_distances = np.sqrt(np.maximum(np.take_along_axis(nearest_distances, order, axis=1), 0))
+    rows[~np.isfinite(row_distances)] = -1
+    return rows, row_distances
@@ -0,0 +1,45 @@
+# utils/timing.py
+"""Secciones de página que se re-ejecutan por separado y miden su propia latencia.
+
+`section` convierte una función en un fragmento de Streamlit (`st.fragment`): al
+interactuar con un widget de la sección solo se vuelve a ejecutar esa función, y
+no toda la página. Cada ejecución registra su duración en el log y en
+`st.session_state`, y con `IMDB_SHOW_TIMINGS=1` la muestra al pie de la propia
+sección, de modo que también se ve la latencia de las re-ejecuciones del fragmento.
+"""
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+SHOW_TIMINGS = os.environ.get("IMDB_SHOW_TIMINGS", "0") == "1"
+TIMINGS_KEY = "_section_timings"
+
+
+@contextmanager
+def timed_section(page, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info("Sección %s/%s: %.1f ms", page, name, elapsed_ms)
+        st.session_state.setdefault(TIMINGS_KEY, {})[f"{page}/{name}"] = elapsed_ms
+        if SHOW_TIMINGS:
+            # Dentro del fragmento: se actualiza en cada re-ejecución de la sección
+            st.caption(f"Sección calculada en {elapsed_ms:.0f} ms")
+
+
+def section(page, name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_section(page, name):
+                return func(*args, **kwargs)
+        return st.fragment(wrapper)
+    return decorator
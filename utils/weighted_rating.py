@@ -0,0 +1,104 @@
+# utils/weighted_rating.py
+"""Ranking por calificación ponderada (bayesiana), como el Top 250 de IMDb.
+
+    WR = v / (v + m) * R + m / (v + m) * C
+
+donde R es la calificación del título, v sus votos, m el mínimo de votos que da
+peso a la calificación propia y C la calificación media a priori. Para cada par
+(C, m) se calcula WR de todos los títulos en una sola operación vectorizada y se
+guardan los rankings ya ordenados por (tipo, género, década), con el WR solo de
+las filas que aparecen en ellos, de modo que cambiar de filtro es una búsqueda en
+un diccionario y no un nuevo ordenamiento. Las entradas (título, género, década)
+no dependen de (C, m) y se arman una sola vez.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+ALL = "Todos"
+DEFAULT_MIN_VOTES = 25000
+TOP_N = 30
+GROUP_KEYS = ['titleType', 'genre', 'decade']
+
+
+@dataclass
+class RankingGroups:
+    titles: pd.DataFrame        # Títulos en el orden original de las filas
+    entries: pd.DataFrame       # Una fila por (título, género): row, titleType, genre, decade
+    entry_offsets: np.ndarray   # Las entradas del título i son entries[entry_offsets[i]:entry_offsets[i + 1]]
+    entry_groups: np.ndarray    # Código del grupo (tipo, género, década) de cada entrada
+
+
+def weighted_rating(ratings, votes, prior_mean, min_votes):
+    votes = np.asarray(votes, dtype=np.float64)
+    weight = votes / (votes + min_votes)
+    return weight * np.asarray(ratings, dtype=np.float64) + (1 - weight) * prior_mean
+
+
+def decade_label(years):
+    return (np.asarray(years) // 10 * 10).astype(int).astype(str) + "s"
+
+
+def build_ranking_groups(frame):
+    # No depende de (C, m): se arma una sola vez y se reutiliza para cada par
+    titles = frame.reset_index(drop=True)
+    genres = titles['genres'].fillna('').str.split(',')
+    counts = genres.str.len().to_numpy()
+    rows = np.repeat(np.arange(len(titles)), counts)
+    entries = pd.DataFrame({
+        'row': rows,
+        'titleType': titles['titleType'].to_numpy()[rows],
+        'genre': np.concatenate(genres.to_numpy()) if len(titles) else np.array([], dtype=object),
+        'decade': decade_label(titles['startYear'].to_numpy())[rows],
+    })
+    return RankingGroups(
+        titles=titles,
+        entries=entries,
+        entry_offsets=np.concatenate([[0], np.cumsum(counts)]),
+        entry_groups=entries.groupby(GROUP_KEYS, sort=False).ngroup().to_numpy(),
+    )
+
+
+def build_rankings(groups, prior_mean, min_votes, n=TOP_N):
+    """Top `n` por WR para cada (titleType, género, década), incluyendo "Todos".
+
+    `rankings[(tipo, género, década)]` es `(filas, wr)`: las filas del grupo de mayor
+    a menor WR y su calificación ponderada. No se guarda el WR del resto del catálogo.
+    """
+    titles = groups.titles
+    wr = weighted_rating(titles['averageRating'], titles['numVotes'], prior_mean, min_votes)
+
+    # Un solo ordenamiento global; las entradas de cada título se toman en ese orden sin reordenar
+    order = np.lexsort((-titles['numVotes'].to_numpy(), -wr))
+    counts = np.diff(groups.entry_offsets)[order]
+    starts = np.repeat(groups.entry_offsets[order] - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+    ranked_entries = starts + np.arange(len(starts))
+
+    # Nivel más fino primero; un título del Top N de un grupo con "Todos" está en el
+    # Top N de alguno de sus subgrupos, así que los niveles agregados parten de estos candidatos
+    ranked_groups = groups.entry_groups[ranked_entries]
+    in_top = pd.Series(ranked_groups).groupby(ranked_groups).cumcount().to_numpy() < n
+    finest = groups.entries.iloc[ranked_entries[in_top]]
+    levels = [finest]
+    for genre_all, decade_all in [(True, False), (False, True), (True, True)]:
+        level = finest.assign(
+            genre=ALL if genre_all else finest['genre'],
+            decade=ALL if decade_all else finest['decade'],
+        ).drop_duplicates(['row'] + GROUP_KEYS)
+        levels.append(level.groupby(GROUP_KEYS, sort=False).head(n))
+
+    top = pd.concat(levels, ignore_index=True)
+    rankings = {}
+    for key, group in top.groupby(GROUP_KEYS, sort=False):
+        rows = group['row'].to_numpy()
+        rankings[key] = (rows, wr[rows])
+    return rankings
+
+
+def top_n(groups, rankings, title_type, genre=ALL, decade=ALL):
+    ranking = rankings.get((title_type, genre, decade))
+    if ranking is None:
+        return groups.titles.iloc[0:0].assign(weightedRating=[])
+    rows, wr = ranking
+    return groups.titles.iloc[rows].assign(weightedRating=wr)